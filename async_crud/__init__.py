@@ -0,0 +1,68 @@
+"""
+crud パッケージの非同期版（AsyncSession用）
+
+DB_MODE=async のときに async_routers から使用する。
+関数名・引数は crud パッケージと同じで、db に AsyncSession を受け取る。
+"""
+from .users import (
+    get_user,
+    get_user_by_username,
+    get_user_for_auth,
+    get_user_by_email,
+    get_users,
+    create_user,
+    update_user,
+    delete_user,
+    get_users_by_corporation
+)
+
+from .corporations import (
+    get_corporation,
+    get_corporation_by_name,
+    get_corporation_by_code,
+    get_corporations,
+    create_corporation,
+    update_corporation,
+    delete_corporation
+)
+
+from .shops import (
+    get_shop,
+    get_shops,
+    create_shop,
+    update_shop,
+    delete_shop,
+    get_shops_by_corporation,
+    add_shop_to_corporation,
+    remove_shop_from_corporation
+)
+
+from .inquiries import (
+    get_inquiry,
+    get_inquiries,
+    get_inquiries_by_user,
+    get_inquiries_assigned_to_user,
+    get_inquiries_by_corporation,
+    create_inquiry,
+    update_inquiry,
+    assign_inquiry,
+    update_inquiry_status,
+    delete_inquiry
+)
+
+__all__ = [
+    # Users
+    "get_user", "get_user_by_username", "get_user_for_auth", "get_user_by_email",
+    "get_users", "create_user", "update_user", "delete_user", "get_users_by_corporation",
+    # Corporations
+    "get_corporation", "get_corporation_by_name", "get_corporation_by_code",
+    "get_corporations", "create_corporation", "update_corporation", "delete_corporation",
+    # Shops
+    "get_shop", "get_shops", "create_shop", "update_shop",
+    "delete_shop", "get_shops_by_corporation", "add_shop_to_corporation",
+    "remove_shop_from_corporation",
+    # Inquiries
+    "get_inquiry", "get_inquiries", "get_inquiries_by_user", "get_inquiries_assigned_to_user",
+    "get_inquiries_by_corporation", "create_inquiry",
+    "update_inquiry", "assign_inquiry", "update_inquiry_status", "delete_inquiry"
+]
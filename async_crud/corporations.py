@@ -0,0 +1,61 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import models
+from pagination import paginate
+from schemas.corporations import CorporationCreate, CorporationUpdate
+
+
+async def get_corporation(db: AsyncSession, corporation_id: int):
+    return await db.get(models.Corporation, corporation_id)
+
+
+async def get_corporation_by_name(db: AsyncSession, name: str):
+    result = await db.execute(select(models.Corporation).filter(models.Corporation.name == name))
+    return result.scalars().first()
+
+
+async def get_corporation_by_code(db: AsyncSession, code: str):
+    result = await db.execute(select(models.Corporation).filter(models.Corporation.code == code))
+    return result.scalars().first()
+
+
+async def get_corporations(db: AsyncSession, skip: int = 0, limit: int = 100, after: int = None):
+    result = await db.execute(
+        paginate(select(models.Corporation), models.Corporation.id, skip, limit, after)
+    )
+    return result.scalars().all()
+
+
+async def create_corporation(db: AsyncSession, corporation: CorporationCreate):
+    db_corporation = models.Corporation(
+        name=corporation.name,
+        code=corporation.code,
+        description=corporation.description
+    )
+    db.add(db_corporation)
+    await db.commit()
+    await db.refresh(db_corporation)
+    return db_corporation
+
+
+async def update_corporation(db: AsyncSession, corporation_id: int, corporation: CorporationUpdate):
+    db_corporation = await get_corporation(db, corporation_id)
+    if not db_corporation:
+        return None
+
+    update_data = corporation.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_corporation, key, value)
+
+    await db.commit()
+    await db.refresh(db_corporation)
+    return db_corporation
+
+
+async def delete_corporation(db: AsyncSession, corporation_id: int):
+    db_corporation = await get_corporation(db, corporation_id)
+    if db_corporation:
+        await db.delete(db_corporation)
+        await db.commit()
+        return True
+    return False
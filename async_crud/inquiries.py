@@ -0,0 +1,132 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import models
+from pagination import paginate
+from schemas.inquiries import InquiryCreate, InquiryUpdate, InquiryStatusUpdate
+
+
+async def get_inquiry(db: AsyncSession, inquiry_id: int, corporation_id: int = None, authorized=None):
+    """
+    マルチテナント対応の問い合わせ個別取得
+    corporation_id が指定された場合、そのテナントのデータのみを返す
+    authorized（policy_query.authorization_filter の式）が指定された場合、認可済みの行のみを返す
+    """
+    query = select(models.Inquiry).filter(models.Inquiry.id == inquiry_id)
+
+    # マルチテナントフィルタリング（必須）
+    if corporation_id is not None:
+        query = query.filter(models.Inquiry.corporation_id == corporation_id)
+    if authorized is not None:
+        query = query.filter(authorized)
+
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def get_inquiries(db: AsyncSession, skip: int = 0, limit: int = 100, status: str = None, priority: str = None, corporation_id: int = None, authorized=None, after: int = None):
+    """
+    マルチテナント対応の問い合わせ一覧取得
+    corporation_id が指定された場合、そのテナントのデータのみを返す
+    authorized（policy_query.authorization_filter の式）が指定された場合、認可済みの行のみを返す
+    after（前のページの最後のID）が指定された場合、skipの代わりにキーセットで次のページを返す
+    """
+    query = select(models.Inquiry)
+
+    # マルチテナントフィルタリング（必須）
+    if corporation_id is not None:
+        query = query.filter(models.Inquiry.corporation_id == corporation_id)
+    if authorized is not None:
+        query = query.filter(authorized)
+
+    if status:
+        query = query.filter(models.Inquiry.status == status)
+    if priority:
+        query = query.filter(models.Inquiry.priority == priority)
+    result = await db.execute(paginate(query, models.Inquiry.id, skip, limit, after))
+    return result.scalars().all()
+
+
+async def _get_inquiries_by(db: AsyncSession, column, value, skip: int, limit: int):
+    result = await db.execute(select(models.Inquiry).filter(column == value).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+async def get_inquiries_by_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+    return await _get_inquiries_by(db, models.Inquiry.user_id, user_id, skip, limit)
+
+
+async def get_inquiries_assigned_to_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+    return await _get_inquiries_by(db, models.Inquiry.assigned_to_id, user_id, skip, limit)
+
+
+async def get_inquiries_by_corporation(db: AsyncSession, corporation_id: int, skip: int = 0, limit: int = 100):
+    return await _get_inquiries_by(db, models.Inquiry.corporation_id, corporation_id, skip, limit)
+
+
+async def create_inquiry(db: AsyncSession, inquiry: InquiryCreate):
+    db_inquiry = models.Inquiry(
+        title=inquiry.title,
+        content=inquiry.content,
+        status=inquiry.status,
+        priority=inquiry.priority,
+        user_id=inquiry.user_id,
+        shop_id=inquiry.shop_id,
+        corporation_id=inquiry.corporation_id
+    )
+    db.add(db_inquiry)
+    await db.commit()
+    await db.refresh(db_inquiry)
+    return db_inquiry
+
+
+async def update_inquiry(db: AsyncSession, inquiry_id: int, inquiry: InquiryUpdate, corporation_id: int = None):
+    db_inquiry = await get_inquiry(db, inquiry_id, corporation_id)
+    if not db_inquiry:
+        return None
+
+    update_data = inquiry.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_inquiry, key, value)
+
+    await db.commit()
+    await db.refresh(db_inquiry)
+    return db_inquiry
+
+
+async def assign_inquiry(db: AsyncSession, inquiry_id: int, assigned_to_id: int, corporation_id: int = None):
+    db_inquiry = await get_inquiry(db, inquiry_id, corporation_id)
+    if not db_inquiry:
+        return None
+
+    db_inquiry.assigned_to_id = assigned_to_id
+    db_inquiry.status = "in_progress" if db_inquiry.status == "pending" else db_inquiry.status
+    await db.commit()
+    await db.refresh(db_inquiry)
+    return db_inquiry
+
+
+async def update_inquiry_status(db: AsyncSession, inquiry_id: int, status_update: InquiryStatusUpdate, corporation_id: int = None):
+    db_inquiry = await get_inquiry(db, inquiry_id, corporation_id)
+    if not db_inquiry:
+        return None
+
+    db_inquiry.status = status_update.status
+    if status_update.status == "resolved" and status_update.resolved_at:
+        db_inquiry.resolved_at = status_update.resolved_at
+    elif status_update.status == "resolved":
+        db_inquiry.resolved_at = datetime.utcnow()
+
+    await db.commit()
+    await db.refresh(db_inquiry)
+    return db_inquiry
+
+
+async def delete_inquiry(db: AsyncSession, inquiry_id: int, corporation_id: int = None):
+    db_inquiry = await get_inquiry(db, inquiry_id, corporation_id)
+    if db_inquiry:
+        await db.delete(db_inquiry)
+        await db.commit()
+        return True
+    return False
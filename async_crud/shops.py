@@ -0,0 +1,117 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+import models
+from pagination import paginate
+from schemas.shops import ShopCreate, ShopUpdate
+
+
+async def get_shop(db: AsyncSession, shop_id: int, corporation_id: int = None, authorized=None):
+    """
+    マルチテナント対応の店舗個別取得
+    corporation_id が指定された場合、そのテナントのデータのみを返す
+    authorized（policy_query.authorization_filter の式）が指定された場合、認可済みの行のみを返す
+    """
+    query = select(models.Shop).filter(models.Shop.id == shop_id)
+
+    # マルチテナントフィルタリング
+    if corporation_id is not None:
+        query = query.filter(models.Shop.corporation_id == corporation_id)
+    if authorized is not None:
+        query = query.filter(authorized)
+
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+async def get_shops(db: AsyncSession, skip: int = 0, limit: int = 100, corporation_id: int = None, authorized=None, after: int = None):
+    """
+    マルチテナント対応の店舗一覧取得
+    corporation_id が指定された場合、そのテナントのデータのみを返す
+    authorized（policy_query.authorization_filter の式）が指定された場合、認可済みの行のみを返す
+    after（前のページの最後のID）が指定された場合、skipの代わりにキーセットで次のページを返す
+    """
+    query = select(models.Shop)
+
+    # マルチテナントフィルタリング
+    if corporation_id is not None:
+        query = query.filter(models.Shop.corporation_id == corporation_id)
+    if authorized is not None:
+        query = query.filter(authorized)
+
+    result = await db.execute(paginate(query, models.Shop.id, skip, limit, after))
+    return result.scalars().all()
+
+
+async def get_shops_by_corporation(db: AsyncSession, corporation_id: int, skip: int = 0, limit: int = 100, after: int = None):
+    """特定法人の店舗一覧を取得"""
+    query = select(models.Shop).filter(models.Shop.corporation_id == corporation_id)
+    result = await db.execute(paginate(query, models.Shop.id, skip, limit, after))
+    return result.scalars().all()
+
+
+async def create_shop(db: AsyncSession, shop: ShopCreate):
+    """新規店舗作成"""
+    db_shop = models.Shop(**shop.dict())
+    db.add(db_shop)
+    await db.commit()
+    await db.refresh(db_shop)
+    return db_shop
+
+
+async def update_shop(db: AsyncSession, shop_id: int, shop: ShopUpdate, corporation_id: int = None, authorized=None):
+    """店舗情報更新"""
+    db_shop = await get_shop(db, shop_id, corporation_id, authorized)
+    if not db_shop:
+        return None
+
+    update_data = shop.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_shop, key, value)
+
+    await db.commit()
+    await db.refresh(db_shop)
+    return db_shop
+
+
+async def delete_shop(db: AsyncSession, shop_id: int, corporation_id: int = None, authorized=None):
+    """店舗削除"""
+    db_shop = await get_shop(db, shop_id, corporation_id, authorized)
+    if db_shop:
+        await db.delete(db_shop)
+        await db.commit()
+        return True
+    return False
+
+
+async def _get_shop_with_corporations(db: AsyncSession, shop_id: int):
+    result = await db.execute(
+        select(models.Shop).options(selectinload(models.Shop.corporations)).filter(models.Shop.id == shop_id)
+    )
+    return result.scalars().first()
+
+
+async def add_shop_to_corporation(db: AsyncSession, shop_id: int, corporation_id: int):
+    """店舗を法人に関連付け（多対多）"""
+    shop = await _get_shop_with_corporations(db, shop_id)
+    corporation = await db.get(models.Corporation, corporation_id)
+
+    if shop and corporation:
+        if corporation not in shop.corporations:
+            shop.corporations.append(corporation)
+            await db.commit()
+        return shop
+    return None
+
+
+async def remove_shop_from_corporation(db: AsyncSession, shop_id: int, corporation_id: int):
+    """店舗と法人の関連を解除"""
+    shop = await _get_shop_with_corporations(db, shop_id)
+    corporation = await db.get(models.Corporation, corporation_id)
+
+    if shop and corporation:
+        if corporation in shop.corporations:
+            shop.corporations.remove(corporation)
+            await db.commit()
+        return shop
+    return None
@@ -0,0 +1,119 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+import models
+from pagination import paginate
+from crud.users import get_password_hash
+from schemas.users import UserCreate, UserUpdate
+
+# レスポンスモデル（schemas.User）が参照するロールは事前に読み込む（AsyncSessionでは遅延ロード不可）
+_with_role = selectinload(models.User.role)
+
+
+async def get_user(db: AsyncSession, user_id: int):
+    result = await db.execute(
+        select(models.User).options(_with_role).filter(models.User.id == user_id)
+    )
+    return result.scalars().first()
+
+
+async def get_user_by_username(db: AsyncSession, username: str):
+    result = await db.execute(
+        select(models.User).options(_with_role).filter(models.User.username == username)
+    )
+    return result.scalars().first()
+
+
+async def get_user_for_auth(db: AsyncSession, username: str):
+    """認証用: ロール・法人をeager loadしてユーザーを取得（1クエリ）"""
+    result = await db.execute(
+        select(models.User).options(
+            joinedload(models.User.role),
+            joinedload(models.User.corporation)
+        ).filter(models.User.username == username)
+    )
+    return result.scalars().first()
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(
+        select(models.User).options(_with_role).filter(models.User.email == email)
+    )
+    return result.scalars().first()
+
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, after: int = None):
+    result = await db.execute(
+        paginate(select(models.User).options(_with_role), models.User.id, skip, limit, after)
+    )
+    return result.scalars().all()
+
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    # bcryptはCPUを占有するため、イベントループを塞がないようスレッドで実行
+    hashed_password = await asyncio.to_thread(get_password_hash, user.password)
+    db_user = models.User(
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        hashed_password=hashed_password,
+        corporation_id=user.corporation_id
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return await get_user(db, db_user.id)
+
+
+async def update_user(db: AsyncSession, user_id: int, user: UserUpdate):
+    db_user = await get_user(db, user_id)
+    if not db_user:
+        return None
+
+    update_data = user.dict(exclude_unset=True)
+    if "password" in update_data:
+        update_data["hashed_password"] = await asyncio.to_thread(get_password_hash, update_data["password"])
+        del update_data["password"]
+
+    old_username = db_user.username
+    for key, value in update_data.items():
+        setattr(db_user, key, value)
+
+    await db.commit()
+    await db.refresh(db_user)
+
+    # ユーザー名・ロール・法人が変わった場合はCasbinのgルールを同期（改名前の名前の行は削除）
+    if update_data.keys() & {"username", "role_id", "corporation_id"}:
+        from casbin_config import sync_user_roles_to_casbin
+        removed = [old_username] if old_username != db_user.username else []
+        await asyncio.to_thread(sync_user_roles_to_casbin, user_id=user_id, removed_usernames=removed)
+
+    # 認証キャッシュ上の古いスナップショットを破棄
+    from principal import invalidate_user_principal
+    invalidate_user_principal(user_id)
+    return await get_user(db, user_id)
+
+
+async def delete_user(db: AsyncSession, user_id: int):
+    db_user = await get_user(db, user_id)
+    if db_user:
+        username = db_user.username
+        await db.delete(db_user)
+        await db.commit()
+
+        # 削除したユーザーのgルールを削除
+        from casbin_config import sync_user_roles_to_casbin
+        await asyncio.to_thread(sync_user_roles_to_casbin, user_id=user_id, removed_usernames=[username])
+
+        from principal import invalidate_user_principal
+        invalidate_user_principal(user_id)
+        return True
+    return False
+
+
+async def get_users_by_corporation(db: AsyncSession, corporation_id: int, skip: int = 0, limit: int = 100, after: int = None):
+    query = select(models.User).options(_with_role).filter(models.User.corporation_id == corporation_id)
+    result = await db.execute(paginate(query, models.User.id, skip, limit, after))
+    return result.scalars().all()
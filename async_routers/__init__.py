@@ -0,0 +1,6 @@
+"""
+routers パッケージの非同期版（DB_MODE=async で使用）
+
+エンドポイント・レスポンスは routers と同じで、DBアクセスに AsyncSession を使用する。
+auth / roles は Casbinポリシーの同期書き込みを伴うため、同期版のルーターを使用する。
+"""
@@ -0,0 +1,149 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+import async_crud
+import schemas
+from database import get_async_db
+from auth import security, get_current_principal_async
+from principal import Principal
+from authorization_manager import authorization_manager_async
+from pagination import parse_cursor, set_next_cursor
+
+router = APIRouter(
+    prefix="/corporations",
+    tags=["corporations"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/", response_model=List[schemas.Corporation], summary="法人一覧取得", dependencies=[Depends(security)])
+async def read_corporations(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    法人一覧を取得します。
+    """
+    corporations = await async_crud.get_corporations(db, skip=skip, limit=limit, after=parse_cursor(cursor))
+    set_next_cursor(response, corporations, limit)
+    return corporations
+
+
+@router.get("/{corporation_id}", response_model=schemas.Corporation, summary="法人詳細取得", dependencies=[Depends(security)])
+async def read_corporation(
+    corporation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    エンドポイントでは、authorization_managerを呼ぶ
+
+    """
+    # 権限チェックは依存性注入で実行済み
+    db_corporation = await async_crud.get_corporation(db, corporation_id=corporation_id)
+    if db_corporation is None:
+        raise HTTPException(status_code=404, detail="Corporation not found")
+    return db_corporation
+
+
+@router.delete("/{corporation_id}", summary="法人削除", dependencies=[Depends(security)])
+async def delete_corporation(
+    corporation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    指定IDの法人を削除します。
+    """
+    success = await async_crud.delete_corporation(db, corporation_id=corporation_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Corporation not found")
+    return {"message": "Corporation deleted successfully"}
+
+
+@router.get("/{corporation_id}/users", response_model=List[schemas.User], summary="法人所属ユーザー一覧", dependencies=[Depends(security)])
+async def read_corporation_users(
+    corporation_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    指定法人に所属するユーザー一覧を取得します。
+    """
+    # 権限チェックは依存性注入で実行済み
+    db_corporation = await async_crud.get_corporation(db, corporation_id=corporation_id)
+    if db_corporation is None:
+        raise HTTPException(status_code=404, detail="Corporation not found")
+    users = await async_crud.get_users_by_corporation(db, corporation_id=corporation_id, skip=skip, limit=limit, after=parse_cursor(cursor))
+    set_next_cursor(response, users, limit)
+    return users
+
+
+@router.get("/{corporation_id}/shops", response_model=List[schemas.Shop], summary="法人関連店舗一覧", dependencies=[Depends(security)])
+async def read_corporation_shops(
+    corporation_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    指定法人に関連する店舗一覧を取得します。
+    """
+    # 権限チェックは依存性注入で実行済み
+    db_corporation = await async_crud.get_corporation(db, corporation_id=corporation_id)
+    if db_corporation is None:
+        raise HTTPException(status_code=404, detail="Corporation not found")
+    shops = await async_crud.get_shops_by_corporation(db, corporation_id=corporation_id, skip=skip, limit=limit, after=parse_cursor(cursor))
+    set_next_cursor(response, shops, limit)
+    return shops
+
+
+@router.post("/{corporation_id}/shops/{shop_id}", summary="法人と店舗の関連付け", dependencies=[Depends(security)])
+async def add_shop_to_corporation(
+    corporation_id: int,
+    shop_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    法人と店舗を関連付けます。
+    """
+    shop = await async_crud.add_shop_to_corporation(db, shop_id=shop_id, corporation_id=corporation_id)
+    if shop is None:
+        raise HTTPException(status_code=404, detail="Shop or Corporation not found")
+    return {"message": "Shop added to Corporation successfully"}
+
+
+@router.delete("/{corporation_id}/shops/{shop_id}", summary="法人と店舗の関連解除", dependencies=[Depends(security)])
+async def remove_shop_from_corporation(
+    corporation_id: int,
+    shop_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    法人と店舗の関連を解除します。
+    """
+    shop = await async_crud.remove_shop_from_corporation(db, shop_id=shop_id, corporation_id=corporation_id)
+    if shop is None:
+        raise HTTPException(status_code=404, detail="Shop or Corporation not found")
+    return {"message": "Shop removed from Corporation successfully"}
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+import async_crud
+import schemas
+import models
+from database import get_async_db
+from auth import security, get_current_principal_async
+from principal import Principal
+from policy_query import authorization_filter
+from authorization_manager import authorization_manager_async
+from pagination import parse_cursor, set_next_cursor
+
+router = APIRouter(
+    prefix="/inquiries",
+    tags=["inquiries"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/", response_model=List[schemas.Inquiry], summary="問い合わせ一覧取得（管理者のみ）", dependencies=[Depends(security)])
+async def read_inquiries(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    is_authorized: bool = Depends(authorization_manager_async),
+    principal: Principal = Depends(get_current_principal_async)
+):
+    """
+    問い合わせ一覧を取得します。（管理者のみアクセス可能）
+    - **status**: ステータスでフィルタ（pending/in_progress/resolved/closed）
+    - **priority**: 優先度でフィルタ（low/normal/high/urgent）
+
+    **権限**: admin ロールが必要（Casbinで自動判定）
+    **アクセス不可**: accounting ロール
+    **自動判定**: URL /inquiries + GET → inquiries:read 権限チェック
+    """
+    # 権限チェック
+    if not is_authorized:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # マルチテナント対応：Casbinポリシーから求めた認可済みの法人のデータのみを取得
+    inquiries = await async_crud.get_inquiries(
+        db,
+        skip=skip,
+        limit=limit,
+        status=status,
+        priority=priority,
+        authorized=authorization_filter(principal, "inquiries", "read", models.Inquiry.corporation_id),
+        after=parse_cursor(cursor)
+    )
+    set_next_cursor(response, inquiries, limit)
+    return inquiries
+
+
+@router.get("/{inquiry_id}", response_model=schemas.Inquiry, summary="問い合わせ詳細取得（管理者のみ）", dependencies=[Depends(security)])
+async def read_inquiry(
+    inquiry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    is_authorized: bool = Depends(authorization_manager_async),
+    principal: Principal = Depends(get_current_principal_async)
+):
+    """
+    指定IDの問い合わせ詳細を取得します（関連情報含む）。
+
+    **権限**: admin ロールが必要（Casbinで自動判定）
+    **アクセス不可**: accounting ロール
+    **自動判定**: URL /inquiries/{id} + GET → inquiries:read 権限チェック
+    """
+    # 権限チェック
+    if not is_authorized:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # マルチテナント対応：inquiries:read 権限を持つ法人のデータのみを取得
+    db_inquiry = await async_crud.get_inquiry(
+        db,
+        inquiry_id=inquiry_id,
+        authorized=authorization_filter(principal, "inquiries", "read", models.Inquiry.corporation_id)
+    )
+    if db_inquiry is None:
+        raise HTTPException(status_code=404, detail="Inquiry not found")
+    return db_inquiry
@@ -0,0 +1,177 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+import async_crud
+import schemas
+import models
+from database import get_async_db
+from auth import security, get_current_principal_async
+from principal import Principal
+from policy_query import authorization_filter
+from authorization_manager import authorization_manager_async
+from pagination import parse_cursor, set_next_cursor
+
+router = APIRouter(
+    prefix="/shops",
+    tags=["shops"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.post("/", response_model=schemas.Shop, summary="店舗作成", dependencies=[Depends(security)])
+async def create_shop(
+    shop: schemas.ShopCreate,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    新規店舗を作成します。
+    - **name**: 店舗名
+    - **address**: 住所
+    - **manager_name**: 店長名
+    - **business_hours**: 営業時間
+    - **corporation_id**: 所属法人ID
+    """
+
+    # マルチテナント: 自分の法人の店舗のみ作成可能
+    if shop.corporation_id != principal.corporation_id:
+        raise HTTPException(
+            status_code=403,
+            detail=f"You can only create shops for your corporation (ID: {principal.corporation_id})"
+        )
+
+    return await async_crud.create_shop(db=db, shop=shop)
+
+
+@router.get("/", response_model=List[schemas.Shop], summary="店舗一覧取得", dependencies=[Depends(security)])
+async def read_shops(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    店舗一覧を取得します（shops:read 権限を持つ法人のみ）。
+    """
+
+    # マルチテナント対応：Casbinポリシーから求めた認可済みの法人の店舗のみ取得
+    shops = await async_crud.get_shops(
+        db,
+        skip=skip,
+        limit=limit,
+        authorized=authorization_filter(principal, "shops", "read", models.Shop.corporation_id),
+        after=parse_cursor(cursor)
+    )
+    set_next_cursor(response, shops, limit)
+    return shops
+
+
+@router.get("/{shop_id}", response_model=schemas.Shop, summary="店舗詳細取得", dependencies=[Depends(security)])
+async def read_shop(
+    shop_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    指定IDの店舗詳細を取得します。
+
+    マルチテナント対応：shops:read 権限を持つ法人の店舗のみ取得可能
+    """
+    db_shop = await async_crud.get_shop(
+        db,
+        shop_id=shop_id,
+        authorized=authorization_filter(principal, "shops", "read", models.Shop.corporation_id)
+    )
+    if db_shop is None:
+        raise HTTPException(status_code=404, detail="Shop not found")
+    return db_shop
+
+
+@router.put("/{shop_id}", response_model=schemas.Shop, summary="店舗更新", dependencies=[Depends(security)])
+async def update_shop(
+    shop_id: int,
+    shop: schemas.ShopUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    指定IDの店舗情報を更新します。
+    """
+
+    # 更新時に法人 IDを変更しようとした場合はエラー
+    if shop.corporation_id and shop.corporation_id != principal.corporation_id:
+        raise HTTPException(
+            status_code=403,
+            detail="Cannot change shop to different corporation"
+        )
+
+    db_shop = await async_crud.update_shop(
+        db,
+        shop_id=shop_id,
+        shop=shop,
+        authorized=authorization_filter(principal, "shops", "update", models.Shop.corporation_id)
+    )
+    if db_shop is None:
+        raise HTTPException(status_code=404, detail="Shop not found")
+    return db_shop
+
+
+@router.delete("/{shop_id}", summary="店舗削除", dependencies=[Depends(security)])
+async def delete_shop(
+    shop_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    指定IDの店舗を削除します。
+    """
+
+    success = await async_crud.delete_shop(
+        db,
+        shop_id=shop_id,
+        authorized=authorization_filter(principal, "shops", "delete", models.Shop.corporation_id)
+    )
+    if not success:
+        raise HTTPException(status_code=404, detail="Shop not found")
+    return {"message": "Shop deleted successfully"}
+
+
+@router.get("/corporation/{corporation_id}/shops", response_model=List[schemas.Shop], summary="法人の店舗一覧", dependencies=[Depends(security)])
+async def read_corporation_shops(
+    corporation_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),  # 認証
+    authorized: bool = Depends(authorization_manager_async)  # 認可
+):
+    """
+    指定法人に所属する店舗一覧を取得します。
+
+    マルチテナント対応：自法人のみアクセス可能
+    """
+
+    # マルチテナントチェック
+    if corporation_id != principal.corporation_id:
+        raise HTTPException(
+            status_code=403,
+            detail=f"You can only access shops for your corporation (ID: {principal.corporation_id})"
+        )
+
+    db_corporation = await async_crud.get_corporation(db, corporation_id=corporation_id)
+    if db_corporation is None:
+        raise HTTPException(status_code=404, detail="Corporation not found")
+
+    shops = await async_crud.get_shops_by_corporation(db, corporation_id=corporation_id, skip=skip, limit=limit, after=parse_cursor(cursor))
+    set_next_cursor(response, shops, limit)
+    return shops
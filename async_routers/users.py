@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import async_crud
+import schemas
+from database import get_async_db
+from auth import security, get_current_principal_async
+from principal import Principal
+
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.post("/", response_model=schemas.User, summary="ユーザー作成", dependencies=[Depends(security)])
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    新規ユーザーを作成します。
+    - **username**: ユーザー名（一意）
+    - **email**: メールアドレス（一意）
+    - **password**: パスワード
+    - **corporation_id**: 所属法人ID（オプション）
+    """
+    db_user = await async_crud.get_user_by_email(db, email=user.email)
+    if db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    db_user = await async_crud.get_user_by_username(db, username=user.username)
+    if db_user:
+        raise HTTPException(status_code=400, detail="Username already registered")
+    return await async_crud.create_user(db=db, user=user)
+
+
+@router.get("/me", response_model=schemas.User, summary="現在のユーザー情報取得")
+async def read_current_user(principal: Principal = Depends(get_current_principal_async)):
+    """
+    現在ログイン中のユーザー情報を取得します。
+    """
+    return principal.user
+
+
+@router.get("/{user_id}", response_model=schemas.User, summary="ユーザー詳細取得", dependencies=[Depends(security)])
+async def read_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    指定IDのユーザー詳細を取得します。
+    """
+    db_user = await async_crud.get_user(db, user_id=user_id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
+
+@router.delete("/{user_id}", summary="ユーザー削除", dependencies=[Depends(security)])
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    指定IDのユーザーを削除します。
+    """
+    success = await async_crud.delete_user(db, user_id=user_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"message": "User deleted successfully"}
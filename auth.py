@@ -1,9 +1,13 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+import async_crud
 import crud
-from database import get_db
-import models
+from database import get_async_db, get_db
+from enforcer_registry import is_domain_loaded
+from principal import Principal, UserSnapshot, domain_for, principal_cache
 
 security = HTTPBearer(
     scheme_name="Bearer Token",
@@ -11,24 +15,71 @@ security = HTTPBearer(
 )
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> models.User:
-    """シンプルなトークンから現在のユーザーを取得"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    シンプルなトークンから現在のPrincipal（ユーザー・ドメイン・ロール）を取得
+
+    ユーザーはロール・法人をeager loadした1クエリで取得し、スナップショットをトークン単位でキャッシュする。
+    FastAPIの依存性キャッシュにより、同一リクエスト内では1回だけ実行される。
+    """
     # Simple token format: username (e.g., "alice", "dave")
     username = credentials.credentials
     if not username:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    user = crud.get_user_by_username(db, username=username)
+    # キャッシュ済みならデータベースを参照しない
+    user = principal_cache.get(username)
     if user is None:
-        raise credentials_exception
+        # 読み込み中に無効化された場合は登録しない
+        generation = principal_cache.generation
+        db_user = crud.get_user_for_auth(db, username=username)
+        if db_user is None:
+            raise _credentials_exception()
+        user = UserSnapshot.from_user(db_user)
+        principal_cache.set(username, user, generation)
+
+    return Principal.from_user(user)
+
+
+async def get_current_principal_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    get_current_principal の非同期版（DB_MODE=async のルーター用）
+
+    ロールの解決でドメインのポリシー読み込み（filteredモード）が必要な場合は、
+    データベースへの同期アクセスでイベントループを止めないようスレッドプールで実行する。
+    """
+    username = credentials.credentials
+    if not username:
+        raise _credentials_exception()
+
+    user = principal_cache.get(username)
+    if user is None:
+        generation = principal_cache.generation
+        db_user = await async_crud.get_user_for_auth(db, username=username)
+        if db_user is None:
+            raise _credentials_exception()
+        user = UserSnapshot.from_user(db_user)
+        principal_cache.set(username, user, generation)
+
+    if not is_domain_loaded(domain_for(user.corporation_id)):
+        return await run_in_threadpool(Principal.from_user, user)
+    return Principal.from_user(user)
+
 
-    return user
\ No newline at end of file
+def get_current_user(principal: Principal = Depends(get_current_principal)) -> UserSnapshot:
+    """シンプルなトークンから現在のユーザー（不変スナップショット）を取得"""
+    return principal.user
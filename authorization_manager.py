@@ -1,10 +1,17 @@
 """
 シンプルなドメインベースCasbin認可マネージャー
 """
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
 from fastapi import Depends, Request, HTTPException
-import models
-from auth import get_current_user
-from casbin_config import get_casbin_enforcer
+from fastapi.concurrency import run_in_threadpool
+from auth import get_current_principal, get_current_principal_async
+from principal import Principal
+from enforcer_registry import get_enforcer, is_domain_loaded
+from request_metrics import timed_authorization
+
+# 管理用エンドポイントに必要なロール
+ADMIN_ROLE = "admin"
 
 
 def extract_resource_from_path(path: str) -> str:
@@ -33,12 +40,13 @@ def map_method_to_action(method: str) -> str:
     return action_map.get(method, "read")
 
 
-def authorize_request(user: models.User, resource: str, action: str) -> bool:
+@timed_authorization
+def authorize_request(principal: Principal, resource: str, action: str) -> bool:
     """
     ドメインベースCasbinで認可チェック
 
     Args:
-        user: 認証済みユーザー
+        principal: 認証済みのPrincipal（ドメインは認証時に解決済み）
         resource: アクセス対象リソース
         action: 実行アクション
 
@@ -47,14 +55,12 @@ def authorize_request(user: models.User, resource: str, action: str) -> bool:
     """
     try:
         # ユーザーの所属法人をドメインとして使用
-        if user.corporation_id is None:
+        if principal.domain is None:
             return False
 
-        domain = f"corporation_{user.corporation_id}"
-
-        # Casbinで認可チェック
-        enforcer = get_casbin_enforcer()
-        result = enforcer.enforce(user.username, domain, resource, action)
+        # Casbinで認可チェック（起動時に構築した共有エンフォーサーを使用）
+        enforcer = get_enforcer()
+        result = enforcer.enforce(principal.username, principal.domain, resource, action)
 
         return result
 
@@ -63,9 +69,94 @@ def authorize_request(user: models.User, resource: str, action: str) -> bool:
         return False
 
 
+@timed_authorization
+def batch_authorize(principal: Principal, requests: Iterable[Tuple[str, str]]) -> List[bool]:
+    """
+    複数の (resource, action) をまとめて認可チェック
+
+    一覧画面で行ごとの操作可否（更新・削除ボタンの表示など）を判定する場合に使用する。
+    ロールの継承を含む実効権限はドメインのスナップショットから一度だけ解決し、
+    全ペアを同じスナップショットのコンパイル済みインデックスで判定する。
+
+    Args:
+        principal: 認証済みのPrincipal
+        requests: (resource, action) のリスト
+
+    Returns:
+        List[bool]: requests と同じ順序の判定結果
+    """
+    requests = list(requests)
+    try:
+        if principal.domain is None:
+            return [False] * len(requests)
+
+        enforcer = get_enforcer().snapshot_for(principal.domain)
+        index = getattr(enforcer, "index", None)
+        if index is None:
+            # コンパイル不可のモデル: 同じスナップショットでペアごとに判定
+            return [
+                enforcer.enforce(principal.username, principal.domain, resource, action)
+                for resource, action in requests
+            ]
+
+        permissions = index.permissions_for(principal.username, principal.domain)
+        return [action in permissions.get(resource, ()) for resource, action in requests]
+
+    except Exception as e:
+        print(f"Authorization error: {e}")
+        return [False] * len(requests)
+
+
+@timed_authorization
+def get_effective_permissions(principal: Principal) -> Dict[str, FrozenSet[str]]:
+    """
+    ドメイン内の実効権限（resource → actions）を取得
+
+    ロールの継承（admin → accountant など）とロールテンプレート（dom = "*"）を含む。
+    コンパイル済みインデックスの実効権限をそのまま返す。
+
+    Args:
+        principal: 認証済みのPrincipal
+
+    Returns:
+        Dict[str, FrozenSet[str]]: リソースごとの許可されたアクション
+    """
+    if principal.domain is None:
+        return {}
+
+    enforcer = get_enforcer().snapshot_for(principal.domain)
+    index = getattr(enforcer, "index", None)
+    if index is not None:
+        return index.permissions_for(principal.username, principal.domain)
+
+    # コンパイル不可のモデル: ポリシーに現れる全 (resource, action) を判定
+    pairs = sorted({(rule[2], rule[3]) for rule in enforcer.get_policy() if len(rule) >= 4})
+    permissions: Dict[str, set] = {}
+    for (resource, action), allowed in zip(pairs, batch_authorize(principal, pairs)):
+        if allowed:
+            permissions.setdefault(resource, set()).add(action)
+    return {resource: frozenset(actions) for resource, actions in permissions.items()}
+
+
+def check_authorization(request: Request, principal: Principal) -> bool:
+    """リクエストのURL・メソッドから認可チェックし、権限がない場合はHTTPExceptionを投げる"""
+    # URLとメソッドからリソース・アクションを抽出
+    resource = extract_resource_from_path(request.url.path)
+    action = map_method_to_action(request.method)
+
+    # 認可チェック実行
+    if not authorize_request(principal, resource, action):
+        raise HTTPException(
+            status_code=403,
+            detail=f"You don't have permission to {action} {resource}"
+        )
+
+    return True
+
+
 def authorization_manager(
     request: Request,
-    current_user: models.User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ) -> bool:
     """
     FastAPI依存性注入用の認可チェック関数
@@ -73,19 +164,40 @@ def authorization_manager(
     権限チェックを行い、権限がない場合はHTTPExceptionを投げる
     権限がある場合はTrueを返す
 
-    Note: get_current_userはエンドポイントでも呼ばれる可能性があるが、
+    Note: get_current_principalはエンドポイントでも呼ばれる可能性があるが、
     FastAPIの依存性キャッシュ機能により、同一リクエスト内では1回だけ実行される。
     参照: https://fastapi.tiangolo.com/tutorial/dependencies/#using-the-same-dependency-multiple-times
     """
-    # URLとメソッドからリソース・アクションを抽出
-    resource = extract_resource_from_path(request.url.path)
-    action = map_method_to_action(request.method)
+    return check_authorization(request, principal)
 
-    # 認可チェック実行
-    if not authorize_request(current_user, resource, action):
+
+def admin_authorization_manager(
+    principal: Principal = Depends(get_current_principal)
+) -> bool:
+    """
+    管理用エンドポイント（計測値・ポリシーの再読み込みなど）の認可チェック
+
+    URLからリソースを判定できない（extract_resource_from_path が "unknown" を返す）ため、
+    所属法人ドメインで admin ロール（継承を含む）を持つ場合のみ許可する。
+    """
+    if not principal.has_role(ADMIN_ROLE):
         raise HTTPException(
             status_code=403,
-            detail=f"You don't have permission to {action} {resource}"
+            detail=f"You need the {ADMIN_ROLE} role to access this endpoint"
         )
+    return True
 
-    return True
\ No newline at end of file
+
+async def authorization_manager_async(
+    request: Request,
+    principal: Principal = Depends(get_current_principal_async)
+) -> bool:
+    """
+    authorization_manager の非同期版（DB_MODE=async のルーター用）
+    判定はメモリ上の共有エンフォーサーで行うため、イベントループ上で直接実行する。
+    ドメインのポリシーが未読み込み（filteredモードで破棄された場合など）で判定中に
+    データベースを参照する場合のみ、スレッドプールで実行する。
+    """
+    if not is_domain_loaded(principal.domain):
+        return await run_in_threadpool(check_authorization, request, principal)
+    return check_authorization(request, principal)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+認可処理のベンチマーク
+
+事前に init_db.py と bootstrap_casbin_policies.py を実行しておくこと。
+    python benchmark_authorization.py [反復回数]
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import casbin
+from casbin_sqlalchemy_adapter import Adapter
+from sqlalchemy.orm import joinedload
+
+import models
+from authorization_manager import authorize_request, batch_authorize
+from casbin_config import CASBIN_MODEL, ROLE_TEMPLATES, get_casbin_enforcer
+from database import SessionLocal, engine
+from enforcer_registry import ENFORCER_MODE, get_decision_cache_stats, registry
+from principal import Principal, UserSnapshot
+
+RESOURCES = ["users", "corporations", "shops", "inquiries"]
+ACTIONS = ["read", "create", "update", "delete"]
+
+
+def _measure(label: str, func, iterations: int) -> float:
+    """funcをiterations回実行し、1回あたりの平均時間（マイクロ秒）を表示"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / iterations * 1_000_000
+    print(f"{label:<40} {iterations:>7} calls  {per_call_us:>12.1f} us/call")
+    return per_call_us
+
+
+def _legacy_get_casbin_enforcer(database_url: str, model_path: str) -> casbin.Enforcer:
+    """変更前の get_casbin_enforcer() と同じ処理
+
+    アダプターの作成・model.conf の書き出し・エンフォーサーの構築に加え、
+    ドメインごとのロールポリシーとユーザーのロール割り当ての投入、save_policy() による保存までを毎回行う
+    """
+    adapter = Adapter(database_url)
+    with open(model_path, "w") as f:
+        f.write(CASBIN_MODEL)
+    enforcer = casbin.Enforcer(model_path, adapter)
+
+    db = SessionLocal()
+    try:
+        user_roles_query = db.query(
+            models.User.username,
+            models.User.corporation_id,
+            models.Role.name.label('role_name')
+        ).join(
+            models.Role, models.User.role_id == models.Role.id
+        ).filter(
+            models.User.role_id.isnot(None),
+            models.User.corporation_id.isnot(None)
+        ).all()
+
+        domains_processed = set()
+        for user_role in user_roles_query:
+            domain = f"corporation_{user_role.corporation_id}"
+            if (domain, user_role.role_name) not in domains_processed:
+                for role, obj, act in ROLE_TEMPLATES:
+                    if role == user_role.role_name:
+                        enforcer.add_policy(role, domain, obj, act)
+                        print(f"Added role policy: {role} -> {domain} -> {obj} -> {act}")
+                domains_processed.add((domain, user_role.role_name))
+
+        for user_role in user_roles_query:
+            domain = f"corporation_{user_role.corporation_id}"
+            enforcer.add_grouping_policy(user_role.username, user_role.role_name, domain)
+            print(f"Assigned role '{user_role.role_name}' to user '{user_role.username}' in domain '{domain}'")
+
+        enforcer.save_policy()
+    finally:
+        db.close()
+
+    return enforcer
+
+
+def benchmark_per_request_enforcer(users, iterations: int) -> float:
+    """変更前: リクエストごとにエンフォーサーを構築して判定
+
+    変更前の経路（初期ポリシーの投入と save_policy() を含む）を再現する。
+    save_policy() は casbin_rule を書き換えるため、SQLiteの場合はデータベースのコピーに対して実行する。
+    SQLite以外ではコピーを作れないため、現在の get_casbin_enforcer()（ポリシーの読み込みのみ）で計測する
+    """
+    if engine.url.get_backend_name() != "sqlite" or not engine.url.database:
+        def load_only(i):
+            user = users[i % len(users)]
+            domain = f"corporation_{user.corporation_id}"
+            enforcer = get_casbin_enforcer()
+            enforcer.enforce(user.username, domain, RESOURCES[i % 4], ACTIONS[(i // 4) % 4])
+
+        return _measure("per-request enforcer (load only)", load_only, iterations)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_path = os.path.join(workdir, os.path.basename(engine.url.database))
+        shutil.copyfile(engine.url.database, database_path)
+        database_url = f"sqlite:///{database_path}"
+        model_path = os.path.join(workdir, "model.conf")
+
+        def run(i):
+            user = users[i % len(users)]
+            domain = f"corporation_{user.corporation_id}"
+            # 変更前はリクエストごとに初期化ログを出力していた（計測には含めるが表示はしない）
+            with contextlib.redirect_stdout(io.StringIO()):
+                enforcer = _legacy_get_casbin_enforcer(database_url, model_path)
+            enforcer.enforce(user.username, domain, RESOURCES[i % 4], ACTIONS[(i // 4) % 4])
+
+        return _measure("per-request enforcer (seed+save_policy)", run, iterations)
+
+
+def benchmark_shared_enforcer(users, iterations: int) -> float:
+    """共有エンフォーサー（判定キャッシュなし）で判定"""
+    enforcer = get_casbin_enforcer()
+
+    def run(i):
+        user = users[i % len(users)]
+        domain = f"corporation_{user.corporation_id}"
+        enforcer.enforce(user.username, domain, RESOURCES[i % 4], ACTIONS[(i // 4) % 4])
+
+    return _measure("shared enforcer (no decision cache)", run, iterations)
+
+
+def benchmark_authorize_request(users, iterations: int) -> float:
+    """変更後: 起動時に構築した共有エンフォーサー（CASBIN_ENFORCER_MODE）で判定"""
+    registry.initialize()
+    principals = [Principal.from_user(UserSnapshot.from_user(user)) for user in users]
+
+    def run(i):
+        principal = principals[i % len(principals)]
+        authorize_request(principal, RESOURCES[i % 4], ACTIONS[(i // 4) % 4])
+
+    return _measure(f"authorize_request ({ENFORCER_MODE})", run, iterations)
+
+
+def benchmark_batch_authorize(users, iterations: int, rows: int = 100) -> None:
+    """一覧の行ごとの判定（rows件 × 更新・削除）: authorize_request のループと batch_authorize を比較"""
+    registry.initialize()
+    principals = [Principal.from_user(UserSnapshot.from_user(user)) for user in users]
+    pairs = [(RESOURCES[row % 4], action) for row in range(rows) for action in ("update", "delete")]
+
+    def loop(i):
+        principal = principals[i % len(principals)]
+        return [authorize_request(principal, resource, action) for resource, action in pairs]
+
+    def batch(i):
+        return batch_authorize(principals[i % len(principals)], pairs)
+
+    # 両者の判定結果が一致することを確認
+    for i in range(len(principals)):
+        assert loop(i) == batch(i), f"batch_authorize mismatch for {principals[i]}"
+
+    print(f"\n--- {len(pairs)} (resource, action) pairs per call ---")
+    looped = _measure("loop of authorize_request", loop, iterations)
+    batched = _measure("batch_authorize", batch, iterations)
+    print(f"Batch speedup: {looped / batched:.1f}x")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    db = SessionLocal()
+    try:
+        users = db.query(models.User).options(joinedload(models.User.role)).filter(models.User.corporation_id.isnot(None)).all()
+    finally:
+        db.close()
+
+    if not users:
+        print("No users found. Run init_db.py and bootstrap_casbin_policies.py first.")
+        return
+
+    print("=== Authorization Benchmark ===")
+    before = benchmark_per_request_enforcer(users, max(iterations // 10, 10))
+    benchmark_shared_enforcer(users, iterations)
+    after = benchmark_authorize_request(users, iterations)
+    print(f"\nSpeedup: {before / after:.1f}x")
+    benchmark_batch_authorize(users, max(iterations // 10, 10))
+    print(f"Decision cache: {get_decision_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
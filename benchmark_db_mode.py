@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+同期（DB_MODE=sync）と非同期（DB_MODE=async）ルーターの負荷テスト
+
+モードごとにuvicornを起動し、同時接続数を変えて一覧系エンドポイントにリクエストを送り、
+スループットとレイテンシ（p50 / p99）を比較する。
+事前に init_db.py と bootstrap_casbin_policies.py を実行しておくこと。
+    python benchmark_db_mode.py [総リクエスト数] [同時接続数...]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+HOST = "127.0.0.1"
+PORT = 8765
+PATHS = ["/users/me", "/corporations/1/users", "/shops/", "/inquiries/"]
+TOKEN = "Alice"
+
+
+def _start_server(mode: str) -> subprocess.Popen:
+    env = dict(os.environ, DB_MODE=mode)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", HOST, "--port", str(PORT),
+         "--log-level", "warning"],
+        env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://{HOST}:{PORT}/health", timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"uvicorn ({mode}) did not start")
+
+
+async def _run_load(total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(PATHS[i % len(PATHS)])
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        while True:
+            try:
+                path = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers={"Authorization": f"Bearer {TOKEN}"})
+                if response.status_code >= 500:
+                    errors += 1
+            except httpx.HTTPError:
+                # コネクションプール枯渇などでサーバーが応答できなかった場合
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://{HOST}:{PORT}", limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrencies = [int(c) for c in sys.argv[2:]] or [1, 16, 64, 256]
+
+    print("=== DB Mode Load Test ===")
+    print(f"{'mode':<6} {'concurrency':>11} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>7}")
+    for mode in ("sync", "async"):
+        process = _start_server(mode)
+        try:
+            # ウォームアップ（エンフォーサー構築・認証キャッシュ）
+            asyncio.run(_run_load(len(PATHS) * 10, 1))
+            for concurrency in concurrencies:
+                result = asyncio.run(_run_load(total, concurrency))
+                print(
+                    f"{mode:<6} {concurrency:>11} {result['rps']:>10.1f} "
+                    f"{result['p50_ms']:>10.1f} {result['p99_ms']:>10.1f} {result['errors']:>7}"
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
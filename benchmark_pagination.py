@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+ページネーションのベンチマーク（skip/limit と キーセット）
+
+専用のSQLiteファイルに1法人あたり大量の店舗を投入し、crud.get_shops（GET /shops/ と同じ
+認可フィルター）で深いページを取得したときのレイテンシを比較する。
+.offset(skip) はページが深くなるほど遅くなり、キーセット（after）はページによらずほぼ一定になる。
+    python benchmark_pagination.py [ページ...]
+"""
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+
+DATABASE_PATH = "benchmark_pagination.db"
+LIMIT = 100
+CORPORATION_ID = 1
+# 他の法人の店舗も混在させる（10件に1件）
+OTHER_CORPORATION_ID = 2
+REPEAT = 5
+
+
+def _prepare(engine, rows: int) -> None:
+    """店舗テーブルに rows 件（対象法人分）を投入（件数が足りていれば再利用）"""
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        count = connection.execute(
+            select(func.count()).select_from(models.Shop).where(models.Shop.corporation_id == CORPORATION_ID)
+        ).scalar()
+        if count >= rows:
+            return
+        connection.execute(models.Shop.__table__.delete())
+
+        print(f"Inserting {rows} shops ...")
+        batch = []
+        total = rows + rows // 9
+        for i in range(total):
+            corporation_id = OTHER_CORPORATION_ID if i % 10 == 9 else CORPORATION_ID
+            batch.append({"name": f"shop-{i}", "corporation_id": corporation_id, "is_active": True})
+            if len(batch) == 10000:
+                connection.execute(insert(models.Shop), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(models.Shop), batch)
+
+
+def _median_ms(func) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    pages = [int(page) for page in sys.argv[1:]] or [1, 10, 100, 1000, 10000]
+    rows = max(pages) * LIMIT
+
+    engine = create_engine(f"sqlite:///{DATABASE_PATH}")
+    _prepare(engine, rows)
+    SessionLocal = sessionmaker(bind=engine)
+    authorized = models.Shop.corporation_id == CORPORATION_ID
+
+    print("=== Pagination Benchmark (GET /shops/ query, limit=%d) ===" % LIMIT)
+    print(f"{'page':>7} {'skip/limit ms':>15} {'cursor ms':>11}")
+    db = SessionLocal()
+    try:
+        for page in pages:
+            skip = (page - 1) * LIMIT
+            # 前のページの最後のID（クライアントがカーソルとして受け取る値）
+            after = None
+            if skip:
+                after = db.execute(
+                    select(models.Shop.id).where(authorized).order_by(models.Shop.id).offset(skip - 1).limit(1)
+                ).scalar()
+
+            offset_rows = crud.get_shops(db, skip=skip, limit=LIMIT, authorized=authorized)
+            cursor_rows = crud.get_shops(db, limit=LIMIT, authorized=authorized, after=after)
+            assert [s.id for s in offset_rows] == [s.id for s in cursor_rows], f"page {page} mismatch"
+
+            offset_ms = _median_ms(lambda: crud.get_shops(db, skip=skip, limit=LIMIT, authorized=authorized))
+            cursor_ms = _median_ms(lambda: crud.get_shops(db, limit=LIMIT, authorized=authorized, after=after))
+            print(f"{page:>7} {offset_ms:>15.2f} {cursor_ms:>11.2f}")
+            db.expunge_all()
+    finally:
+        db.close()
+        engine.dispose()
+
+    print(f"\n(database: {os.path.abspath(DATABASE_PATH)})")
+
+
+if __name__ == "__main__":
+    main()
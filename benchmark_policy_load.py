@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+ドメイン単位のポリシー読み込みのベンチマーク（casbin_rule のインデックス）
+
+専用のSQLiteファイルに約100万行の casbin_rule（多数の法人ドメインの p / g 行）を投入し、
+1ドメイン分の読み込み時間を次の条件で比較する。
+- インデックスなし: load_filtered_policy（p / g の2回のクエリ、全件スキャン）
+- インデックスあり: load_filtered_policy（2回のクエリ）
+- インデックスあり: load_domain_policy（1回のクエリ、DomainFilteredEnforcer が使う経路）
+    python benchmark_policy_load.py [ルール数]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+import casbin
+from casbin_sqlalchemy_adapter.adapter import CasbinRule
+from sqlalchemy import create_engine, func, insert, select
+
+from casbin_config import CASBIN_MODEL, build_policy_filter
+from filtered_enforcer import DOMAIN_FIELDS
+from policy_revision import create_adapter
+from schema_migrations import CASBIN_RULE_INDEXES, ensure_casbin_rule_indexes
+
+DATABASE_PATH = "benchmark_policy_load.db"
+DEFAULT_RULES = 1_000_000
+# 1ドメインあたりの行数（ロールごとの権限 p 行 + ユーザーのロール割り当て g 行）
+ROLES = ["admin", "accountant", "sales"]
+RESOURCES = ["corporations", "users", "shops", "inquiries"]
+USERS_PER_DOMAIN = 8
+SAMPLE_DOMAINS = 50
+
+
+def _domain_rules(domain: str):
+    rows = []
+    for role in ROLES:
+        for resource in RESOURCES:
+            rows.append({"ptype": "p", "v0": role, "v1": domain, "v2": resource, "v3": "read"})
+    for i in range(USERS_PER_DOMAIN):
+        rows.append({"ptype": "g", "v0": f"{domain}_user{i}", "v1": ROLES[i % len(ROLES)], "v2": domain, "v3": None})
+    return rows
+
+
+RULES_PER_DOMAIN = len(_domain_rules("x"))
+
+
+def _prepare(engine, rules: int) -> int:
+    """casbin_rule に rules 件を投入（件数が足りていれば再利用）。ドメイン数を返す"""
+    create_adapter(engine)
+    domains = rules // RULES_PER_DOMAIN
+    with engine.begin() as connection:
+        count = connection.execute(select(func.count()).select_from(CasbinRule)).scalar()
+        if count >= domains * RULES_PER_DOMAIN:
+            return domains
+        connection.execute(CasbinRule.__table__.delete())
+
+        print(f"Inserting {domains * RULES_PER_DOMAIN} rules ({domains} domains) ...")
+        batch = []
+        for d in range(domains):
+            batch.extend(_domain_rules(f"corporation_{d}"))
+            if len(batch) >= 10000:
+                connection.execute(insert(CasbinRule), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(CasbinRule), batch)
+    return domains
+
+
+def _drop_indexes(engine) -> None:
+    with engine.begin() as connection:
+        for index in CASBIN_RULE_INDEXES:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+
+
+def _new_model():
+    return casbin.Enforcer.new_model(text=CASBIN_MODEL)
+
+
+def _load_filtered(adapter, domain: str):
+    model = _new_model()
+    for ptype, field in DOMAIN_FIELDS.items():
+        adapter.load_filtered_policy(model, build_policy_filter(ptype, **{field: [domain]}))
+    return model
+
+
+def _load_domain(adapter, domain: str):
+    model = _new_model()
+    adapter.load_domain_policy(model, domain, DOMAIN_FIELDS)
+    return model
+
+
+def _measure(load, adapter, domains) -> float:
+    timings = []
+    for domain in domains:
+        start = time.perf_counter()
+        model = load(adapter, domain)
+        timings.append((time.perf_counter() - start) * 1000)
+        loaded = len(model.model["p"]["p"].policy) + len(model.model["g"]["g"].policy)
+        assert loaded == RULES_PER_DOMAIN, f"{domain}: loaded {loaded} rules"
+    return statistics.median(timings)
+
+
+def main():
+    rules = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RULES
+    engine = create_engine(f"sqlite:///{DATABASE_PATH}")
+    domain_count = _prepare(engine, rules)
+    adapter = create_adapter(engine, filtered=True)
+
+    random.seed(0)
+    domains = [f"corporation_{random.randrange(domain_count)}" for _ in range(SAMPLE_DOMAINS)]
+    # 両方の経路で同じルールが読み込まれることを確認
+    for domain in domains[:5]:
+        filtered, direct = _load_filtered(adapter, domain), _load_domain(adapter, domain)
+        for sec in ("p", "g"):
+            assert filtered.model[sec][sec].policy == direct.model[sec][sec].policy, domain
+
+    print(f"=== Per-domain Policy Load ({domain_count * RULES_PER_DOMAIN} rules, "
+          f"{domain_count} domains, {RULES_PER_DOMAIN} rules/domain) ===")
+    print(f"{'case':<44} {'median ms':>10}")
+
+    _drop_indexes(engine)
+    # インデックスなしは1回あたりが遅いため、サンプル数を減らす
+    no_index_ms = _measure(_load_filtered, adapter, domains[:5])
+    print(f"{'no index, load_filtered_policy (2 queries)':<44} {no_index_ms:>10.2f}")
+
+    ensure_casbin_rule_indexes(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE casbin_rule")
+    filtered_ms = _measure(_load_filtered, adapter, domains)
+    print(f"{'indexed, load_filtered_policy (2 queries)':<44} {filtered_ms:>10.2f}")
+    direct_ms = _measure(_load_domain, adapter, domains)
+    print(f"{'indexed, load_domain_policy (1 query)':<44} {direct_ms:>10.2f}")
+
+    print(f"\nSpeedup (no index -> load_domain_policy): {no_index_ms / direct_ms:.0f}x")
+    engine.dispose()
+    print(f"(database: {os.path.abspath(DATABASE_PATH)})")
+
+
+if __name__ == "__main__":
+    main()
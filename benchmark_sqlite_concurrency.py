@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+書き込み中の読み込みスループットのベンチマーク（SQLiteの接続設定プロファイル）
+
+プロファイル（DB_PROFILE）ごとに専用のSQLiteファイルを作成し、書き込みスレッドが
+問い合わせの追加・更新をコミットし続けている間に、読み込みスレッドが一覧クエリ
+（GET /shops/ ・ GET /inquiries/ と同じ crud 関数）を実行したときのスループットを比較する。
+GILの影響を受けないよう、書き込み・読み込みはそれぞれ別プロセス（ワーカー相当）で実行する。
+- default: journal_mode=DELETE。コミット中はデータベース全体がロックされ、読み込みが待たされる
+- production: WAL。読み込みは書き込みにブロックされない
+    python benchmark_sqlite_concurrency.py [秒数] [読み込みスレッド数]
+"""
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import models
+from database import create_database_engine
+
+CORPORATION_ID = 1
+USER_ID = 1
+SHOPS = 5000
+INQUIRIES = 5000
+# 書き込みトランザクションあたりの行数
+WRITE_BATCH = 50
+
+
+def _database_path(profile: str) -> str:
+    return f"benchmark_sqlite_{profile}.db"
+
+
+def _prepare(profile: str):
+    path = _database_path(profile)
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    engine = _engine(profile)
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(models.Corporation), [
+            {"id": CORPORATION_ID, "name": "Benchmark Corporation", "code": "BENCH", "is_active": True}
+        ])
+        connection.execute(insert(models.User), [
+            {"id": USER_ID, "username": "benchmark", "email": "benchmark@example.com",
+             "hashed_password": "-", "corporation_id": CORPORATION_ID}
+        ])
+        connection.execute(insert(models.Shop), [
+            {"name": f"shop-{i}", "corporation_id": CORPORATION_ID, "is_active": True}
+            for i in range(SHOPS)
+        ])
+        connection.execute(insert(models.Inquiry), [
+            {"title": f"inquiry-{i}", "content": "benchmark",
+             "user_id": USER_ID, "corporation_id": CORPORATION_ID}
+            for i in range(INQUIRIES)
+        ])
+    engine.dispose()
+
+
+def _engine(profile: str):
+    return create_database_engine(f"sqlite:///{_database_path(profile)}", profile=profile)
+
+
+def _writer(profile: str, ready, stop, results) -> None:
+    engine = _engine(profile)
+    stats = {"writes": 0, "errors": 0}
+    ready.wait()
+    i = 0
+    while not stop.is_set():
+        try:
+            with engine.begin() as connection:
+                connection.execute(insert(models.Inquiry), [
+                    {"title": f"new-{i}-{n}", "content": "benchmark",
+                     "user_id": USER_ID, "corporation_id": CORPORATION_ID}
+                    for n in range(WRITE_BATCH)
+                ])
+                connection.execute(
+                    update(models.Inquiry)
+                    .where(models.Inquiry.id == (i % INQUIRIES) + 1)
+                    .values(status="in_progress")
+                )
+            stats["writes"] += 1
+        except OperationalError:
+            stats["errors"] += 1
+        i += 1
+    engine.dispose()
+    results.put(("writer", stats))
+
+
+def _reader(profile: str, ready, stop, results) -> None:
+    engine = _engine(profile)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    latencies = []
+    errors = 0
+    shops_filter = models.Shop.corporation_id == CORPORATION_ID
+    inquiries_filter = models.Inquiry.corporation_id == CORPORATION_ID
+    ready.wait()
+    n = 0
+    while not stop.is_set():
+        db = SessionLocal()
+        start = time.perf_counter()
+        try:
+            if n % 2:
+                crud.get_shops(db, limit=100, authorized=shops_filter)
+            else:
+                crud.get_inquiries(db, limit=100, authorized=inquiries_filter)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except OperationalError:
+            errors += 1
+        finally:
+            db.close()
+        n += 1
+    engine.dispose()
+    results.put(("reader", {"latencies": latencies, "errors": errors}))
+
+
+def run(profile: str, duration: float, readers: int) -> dict:
+    _prepare(profile)
+    # 全プロセスの準備（import・接続）が終わってから計測を始める
+    ready = multiprocessing.Barrier(readers + 2)
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+
+    processes = [multiprocessing.Process(target=_writer, args=(profile, ready, stop, results))]
+    processes += [
+        multiprocessing.Process(target=_reader, args=(profile, ready, stop, results))
+        for _ in range(readers)
+    ]
+    for process in processes:
+        process.start()
+    ready.wait()
+    time.sleep(duration)
+    stop.set()
+    # 結果を受け取ってから終了を待つ（キューに残ったままだと join が終わらない）
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    stats = {"writes": 0, "errors": 0}
+    all_latencies = []
+    for kind, result in collected:
+        stats["errors"] += result["errors"]
+        if kind == "writer":
+            stats["writes"] += result["writes"]
+        else:
+            all_latencies.extend(result["latencies"])
+    all_latencies.sort()
+
+    engine = _engine(profile)
+    with engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+
+    return {
+        "journal_mode": journal_mode,
+        "reads_per_sec": len(all_latencies) / duration,
+        "p50_ms": statistics.median(all_latencies) if all_latencies else 0.0,
+        "p99_ms": all_latencies[int(len(all_latencies) * 0.99)] if all_latencies else 0.0,
+        "writes_per_sec": stats["writes"] / duration,
+        "errors": stats["errors"],
+    }
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print(f"=== SQLite Read Throughput With an Active Writer ({readers} readers, {duration:.0f}s) ===")
+    print(f"{'profile':<12} {'journal':>8} {'reads/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'writes/s':>9} {'errors':>7}")
+    for profile in ("default", "production"):
+        result = run(profile, duration, readers)
+        print(f"{profile:<12} {result['journal_mode']:>8} {result['reads_per_sec']:>9.0f} "
+              f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+              f"{result['writes_per_sec']:>9.0f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
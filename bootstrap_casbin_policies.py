@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Casbin初期ポリシーの投入コマンド
+
+認可パスからは書き込みを行わないため、ポリシーの初期投入はこのコマンドで一度だけ実行する。
+既存のルールはスキップするので、デプロイのたびに実行しても安全（冪等）。
+    python bootstrap_casbin_policies.py
+"""
+from casbin_config import bootstrap_policies
+
+
+if __name__ == "__main__":
+    added = bootstrap_policies()
+    print(f"\nBootstrap completed: {added} rule(s) added")
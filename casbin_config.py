@@ -1,7 +1,9 @@
+from typing import Iterable, Optional
+
 import casbin
-from casbin_sqlalchemy_adapter import Adapter
-from database import SQLALCHEMY_DATABASE_URL
+from casbin_sqlalchemy_adapter.adapter import CasbinRule, Filter
 from database import SessionLocal
+from policy_revision import bump_policy_revision, create_adapter
 import models
 
 # CasbinのドメインベースマルチテナントRBACモデル定義
@@ -19,9 +21,41 @@ g = _, _, _
 e = some(where (p.eft == allow))
 
 [matchers]
-m = g(r.sub, p.sub, r.dom) && r.dom == p.dom && r.obj == p.obj && r.act == p.act
+m = g(r.sub, p.sub, r.dom) && (p.dom == "*" || r.dom == p.dom) && r.obj == p.obj && r.act == p.act
 """
 
+# CASBIN_MODEL のルールの要素数（p = sub, dom, obj, act / g = user, role, dom）
+RULE_LENGTHS = {"p": 4, "g": 3}
+
+# ロールテンプレートのドメイン
+# p.dom が "*" のルールは全ドメイン共通の権限として扱う（ドメイン固有のルールは追加の権限）
+TEMPLATE_DOMAIN = "*"
+
+# ロールテンプレート（ドメイン独立の権限定義）
+ROLE_TEMPLATES = [
+    # 管理者の権限
+    ("admin", "users", "read"),
+    ("admin", "users", "create"),
+    ("admin", "users", "update"),
+    ("admin", "users", "delete"),
+    ("admin", "corporations", "read"),
+    ("admin", "corporations", "create"),
+    ("admin", "corporations", "update"),
+    ("admin", "corporations", "delete"),
+    ("admin", "shops", "read"),
+    ("admin", "shops", "create"),
+    ("admin", "shops", "update"),
+    ("admin", "shops", "delete"),
+    ("admin", "inquiries", "read"),
+    ("admin", "inquiries", "create"),
+    ("admin", "inquiries", "update"),
+    ("admin", "inquiries", "delete"),
+
+    # 経理の権限
+    ("accountant", "users", "read"),
+    # shopsとinquiriesは経理からアクセス不可（adminのみ）
+]
+
 """
   r = sub, dom, obj, act
   - リクエストの構造を定義
@@ -36,59 +70,73 @@ m = g(r.sub, p.sub, r.dom) && r.dom == p.dom && r.obj == p.obj && r.act == p.act
   - ポリシー（権限）の構造を定義
   - リクエストと同じ4つのパラメータで権限を定義
   - 例: p, Alice, corporation_1, users, read
+  - dom が "*" の場合はロールテンプレート（全ドメイン共通）
+  - 例: p, admin, *, users, read
 
 """
 
 
-def get_casbin_enforcer():
-    """Casbinエンフォーサーを取得"""
-    # SQLAlchemy Adapterを使用してポリシーをデータベースに保存
-    adapter = Adapter(SQLALCHEMY_DATABASE_URL)
+def get_casbin_enforcer(read_only: bool = True, enforcer_class=casbin.Enforcer, filtered: bool = False):
+    """
+    Casbinエンフォーサーを取得
+
+    データベースへの書き込みは行わない。ポリシーの初期投入は
+    bootstrap_casbin_policies.py で一度だけ実行する。
+
+    Args:
+        read_only: Trueの場合、メモリ上のポリシー変更をデータベースへ自動保存しない
+        enforcer_class: 生成するエンフォーサークラス（decision_cache.CachedEnforcer など）
+        filtered: Trueの場合、起動時に全ポリシーを読み込まない（ドメイン単位の読み込み用）
+
+    Returns:
+        casbin_ruleテーブルのポリシーを読み込んだエンフォーサー
+    """
+    # SQLAlchemy Adapterを使用してポリシーをデータベースから読み込む
+    # （書き込み時はポリシーリビジョンも同じトランザクションで更新される）
+    # アプリ共通のEngineを使い、エンフォーサーごとにコネクションプール・DDLを作らない
+    adapter = create_adapter(filtered=filtered)
 
     # モデル設定を文字列から作成
-    with open("model.conf", "w") as f:
-        f.write(CASBIN_MODEL)
+    model = casbin.Enforcer.new_model(text=CASBIN_MODEL)
 
     # エンフォーサーを作成
-    enforcer = casbin.Enforcer("model.conf", adapter)
+    enforcer = enforcer_class(model, adapter)
 
-    # 初期ポリシーを設定
-    setup_initial_policies(enforcer)
+    # 読み取り専用: 認可パスからの書き込みを防ぐ
+    if read_only:
+        enforcer.enable_auto_save(False)
 
     return enforcer
 
 
-def setup_initial_policies(enforcer: casbin.Enforcer):
-    """ドメインベースRBACポリシーを設定"""
+def bootstrap_policies():
+    """
+    初期ポリシーをデータベースへ投入（冪等）
+
+    既に存在するルールは追加しないため、何度実行しても結果は同じ。
+
+    Returns:
+        int: 新規に追加したルール数
+    """
+    enforcer = get_casbin_enforcer(read_only=False)
+    return setup_initial_policies(enforcer)
+
+
+def setup_initial_policies(enforcer: casbin.Enforcer) -> int:
+    """
+    ドメインベースRBACポリシーを設定
+
+    ロールの権限はテンプレート（dom = "*"）として一度だけ登録し、ドメインごとには
+    ユーザーのロール割り当て（g）のみを登録する。
+    不足しているルールのみを1行ずつ追加する（save_policyによる全件再作成は行わない）。
+
+    Returns:
+        int: 新規に追加したルール数
+    """
     # データベースセッション作成
     db = SessionLocal()
 
     try:
-        # ロールベースの権限定義（ドメイン独立）
-        role_policies = [
-            # 管理者の権限
-            ("admin", "users", "read"),
-            ("admin", "users", "create"),
-            ("admin", "users", "update"),
-            ("admin", "users", "delete"),
-            ("admin", "corporations", "read"),
-            ("admin", "corporations", "create"),
-            ("admin", "corporations", "update"),
-            ("admin", "corporations", "delete"),
-            ("admin", "shops", "read"),
-            ("admin", "shops", "create"),
-            ("admin", "shops", "update"),
-            ("admin", "shops", "delete"),
-            ("admin", "inquiries", "read"),
-            ("admin", "inquiries", "create"),
-            ("admin", "inquiries", "update"),
-            ("admin", "inquiries", "delete"),
-
-            # 経理の権限
-            ("accountant", "users", "read"),
-            # shopsとinquiriesは経理からアクセス不可（adminのみ）
-        ]
-
         # ユーザーロール情報を取得
         user_roles_query = db.query(
             models.User.username,
@@ -102,20 +150,20 @@ def setup_initial_policies(enforcer: casbin.Enforcer):
         ).all()
 
 
-        # ドメインごとのロールポリシーを追加
-        domains_processed = set()
-        for user_role in user_roles_query:
-            corporation_id = user_role.corporation_id
-            role_name = user_role.role_name
-            domain = f"corporation_{corporation_id}"
+        added = 0
+
+        # ロールテンプレートを追加（ドメイン数によらずロールごとに1回）
+        for role, obj, act in ROLE_TEMPLATES:
+            if enforcer.add_policy(role, TEMPLATE_DOMAIN, obj, act):
+                added += 1
+                print(f"Added role template: {role} -> {obj} -> {act}")
 
-            # 各ドメインで一度だけロールポリシーを設定
-            if (domain, role_name) not in domains_processed:
-                for role, obj, act in role_policies:
-                    if role == role_name:
-                        enforcer.add_policy(role_name, domain, obj, act)
-                        print(f"Added role policy: {role_name} -> {domain} -> {obj} -> {act}")
-                domains_processed.add((domain, role_name))
+        # テンプレートと重複するドメイン別ルールを削除（旧形式からの移行）
+        templates = set(ROLE_TEMPLATES)
+        for rule in list(enforcer.get_policy()):
+            if len(rule) == 4 and rule[1] != TEMPLATE_DOMAIN and (rule[0], rule[2], rule[3]) in templates:
+                enforcer.remove_policy(*rule)
+                print(f"Removed per-domain rule covered by template: {rule}")
 
         # ユーザーのロール割り当て（ドメインベース）
         for user_role in user_roles_query:
@@ -124,54 +172,193 @@ def setup_initial_policies(enforcer: casbin.Enforcer):
             role_name = user_role.role_name
             domain = f"corporation_{corporation_id}"
 
-            enforcer.add_grouping_policy(username, role_name, domain)
-            print(f"Assigned role '{role_name}' to user '{username}' in domain '{domain}'")
+            if enforcer.add_grouping_policy(username, role_name, domain):
+                added += 1
+                print(f"Assigned role '{role_name}' to user '{username}' in domain '{domain}'")
 
-        # ポリシーを保存
-        enforcer.save_policy()
+        return added
 
     finally:
         db.close()
 
 
-def sync_user_roles_to_casbin():
-    """データベースのユーザーロール情報をCasbinと同期"""
-    from sqlalchemy.orm import Session
-    from database import SessionLocal
-    import models
+def build_policy_filter(ptype: str, **values) -> Filter:
+    """
+    casbin_ruleの読み込みフィルターを作成
+
+    Args:
+        ptype: "p" または "g"
+        values: 列名（v0〜v5）と一致させる値のリスト 例: v1=["corporation_1"]
+    """
+    policy_filter = Filter()
+    policy_filter.ptype = [ptype]
+    for field in ("v0", "v1", "v2", "v3", "v4", "v5"):
+        setattr(policy_filter, field, list(values.get(field, [])))
+    return policy_filter
 
-    enforcer = get_casbin_enforcer()
+
+def sync_user_roles_to_casbin(user_id: Optional[int] = None, removed_usernames: Iterable[str] = ()):
+    """
+    データベースのユーザーロール情報をCasbinと差分同期
+
+    users.role_id から求めたgルール（user, role, corporation_{id}）と casbin_rule を比較し、
+    差分の行のみをアダプター経由で追加・削除する。ロール継承（admin → accountant など）の
+    gルール（v0 がロール名の行）は対象外。
+    全体同期では、削除・改名されたユーザーのgルールも削除する。
+
+    Args:
+        user_id: 指定した場合はそのユーザーのみ同期（ロールの割り当て・解除、ユーザーの更新時）
+        removed_usernames: gルールをすべて削除するユーザー名（ユーザーの削除・改名前の名前）
+
+    Returns:
+        bool: 成功した場合True
+    """
     db = SessionLocal()
 
     try:
-        # 現在のグルーピングポリシーをすべて削除
-        enforcer.clear_grouping_policy()
-
         # データベースから最新のユーザーロール情報を取得
         user_roles_query = db.query(
             models.User.username,
+            models.User.corporation_id,
             models.Role.name.label('role_name')
-        ).join(
+        ).outerjoin(
             models.Role, models.User.role_id == models.Role.id
-        ).filter(
-            models.User.role_id.isnot(None)
-        ).all()
-
-        # 最新のユーザーロール割り当てを追加
-        for user_role in user_roles_query:
-            enforcer.add_grouping_policy(user_role.username, user_role.role_name)
-
-        # ポリシーを保存
-        enforcer.save_policy()
+        )
+        if user_id is not None:
+            user_roles_query = user_roles_query.filter(models.User.id == user_id)
+        user_roles = user_roles_query.all()
+
+        usernames = {user_role.username for user_role in user_roles} | set(removed_usernames)
+        if user_id is not None and not usernames:
+            return True
+        desired = {
+            (user_role.username, user_role.role_name, f"corporation_{user_role.corporation_id}")
+            for user_role in user_roles
+            if user_role.role_name is not None and user_role.corporation_id is not None
+        }
+
+        # 対象ユーザーのgルールのみを読み込む（書き込み専用のためロールリンクは構築しない）
+        enforcer = get_casbin_enforcer(read_only=False, filtered=True)
+        enforcer.enable_auto_build_role_links(False)
+        if user_id is not None:
+            enforcer.load_filtered_policy(build_policy_filter("g", v0=sorted(usernames)))
+            current = {
+                tuple(rule) for rule in enforcer.get_grouping_policy()
+                if rule and rule[0] in usernames
+            }
+        else:
+            enforcer.load_filtered_policy(build_policy_filter("g"))
+            grouping_rules = enforcer.get_grouping_policy()
+            # ロール名（rolesテーブル・gルールでロールとして使われている名前）が v0 の行はロール継承
+            role_names = {name for (name,) in db.query(models.Role.name)}
+            role_names.update(rule[1] for rule in grouping_rules if len(rule) > 1)
+            # 存在しないユーザー（削除・改名済み）の行も含め、ユーザーのgルールすべてと比較する
+            current = {
+                tuple(rule) for rule in grouping_rules
+                if rule and rule[0] not in role_names
+            }
+
+        to_add = sorted(desired - current)
+        to_remove = sorted(current - desired)
+
+        # ドメインなしで登録された旧形式のルールは完全一致で削除する
+        legacy_rules = [rule for rule in to_remove if len(rule) != 3]
+        written_revisions = []
+        for rule in legacy_rules:
+            _remove_grouping_rule_without_domain(db, rule)
+        if legacy_rules:
+            written_revisions.append(bump_policy_revision(db))
+        # SQLiteのロック待ちを避けるため、このセッションのトランザクションを終えてから書き込む
+        db.commit()
+
+        with enforcer.adapter.recording_revisions() as revisions:
+            for rule in to_remove:
+                if len(rule) == 3:
+                    enforcer.remove_grouping_policy(*rule)
+            for rule in to_add:
+                enforcer.add_grouping_policy(*rule)
+        written_revisions.extend(revisions)
+
+        # 共有エンフォーサーに差分のみを反映（この書き込みで進めたリビジョンも読み込み済みとして記録）
+        from enforcer_registry import apply_grouping_delta
+        apply_grouping_delta(to_add, to_remove, written_revisions=written_revisions)
+
+        if to_add or to_remove:
+            print(f"Synced user roles to Casbin: +{len(to_add)} -{len(to_remove)}")
         return True
 
     except Exception as e:
+        db.rollback()
         print(f"Error syncing user roles to Casbin: {e}")
         return False
     finally:
         db.close()
 
 
+def save_policy_delta(ptype: str, added: Iterable[tuple] = (), removed: Iterable[tuple] = ()) -> bool:
+    """
+    p / g ルールの差分をデータベースへ書き込み、共有エンフォーサーにも差分のみを適用
+
+    追加・削除は列の値の完全一致で行い（既に存在する行は追加しない）、同じトランザクションで
+    ポリシーリビジョンを+1する。共有エンフォーサーは全件を再読み込みせず、進めたリビジョンも
+    読み込み済みとして記録するため、ウォッチャーによる再読み込みも発生しない。
+
+    Args:
+        ptype: "p" または "g"
+        added: 追加するルール 例: [("alice", "admin", "corporation_1")]
+        removed: 削除するルール
+
+    Returns:
+        bool: いずれかの行を追加・削除した場合True
+
+    Raises:
+        ValueError: ルールの要素数がモデル定義（RULE_LENGTHS）と異なる場合
+    """
+    added, removed = list(added), list(removed)
+    for rule in (*added, *removed):
+        if len(rule) != RULE_LENGTHS[ptype]:
+            raise ValueError(f"{ptype} rule must have {RULE_LENGTHS[ptype]} elements: {rule}")
+
+    db = SessionLocal()
+    try:
+        to_remove, to_add = [], []
+        for rule in dict.fromkeys(tuple(rule) for rule in removed):
+            if _exact_rule_query(db, ptype, rule).delete(synchronize_session=False):
+                to_remove.append(rule)
+        for rule in dict.fromkeys(tuple(rule) for rule in added):
+            if _exact_rule_query(db, ptype, rule).first() is None:
+                db.add(CasbinRule(ptype=ptype, **{f"v{i}": value for i, value in enumerate(rule)}))
+                to_add.append(rule)
+        if not to_add and not to_remove:
+            db.rollback()
+            return False
+        revision = bump_policy_revision(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    from enforcer_registry import apply_policy_delta
+    apply_policy_delta(ptype, to_add, to_remove, written_revisions=[revision])
+    return True
+
+
+def _exact_rule_query(db, ptype: str, rule):
+    """列の値が rule と完全一致する行（rule より後ろの列はNULL）"""
+    query = db.query(CasbinRule).filter(CasbinRule.ptype == ptype)
+    columns = (CasbinRule.v0, CasbinRule.v1, CasbinRule.v2, CasbinRule.v3, CasbinRule.v4, CasbinRule.v5)
+    for i, column in enumerate(columns):
+        query = query.filter(column == rule[i] if i < len(rule) else column.is_(None))
+    return query
+
+
+def _remove_grouping_rule_without_domain(db, rule) -> None:
+    """v2以降がNULLのgルールを削除（アダプターのremove_policyは指定列のみで一致判定するため）"""
+    _exact_rule_query(db, "g", rule).delete(synchronize_session=False)
+
+
 def check_corporation_access(user_id: int, corporation_id: int, action: str, enforcer: casbin.Enforcer) -> bool:
     """法人アクセス権限をチェック"""
     # ユーザーの所属法人IDと、リクエストされた法人IDが一致するかチェック
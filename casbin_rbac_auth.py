@@ -2,20 +2,14 @@ from typing import List
 from fastapi import Depends, HTTPException, status
 import models
 from auth import get_current_user
-from casbin_config import get_casbin_enforcer
+from casbin_config import TEMPLATE_DOMAIN, save_policy_delta
+from enforcer_registry import registry
 import casbin
 
 
-# グローバルなエンフォーサーインスタンス
-_enforcer = None
-
-
 def get_enforcer() -> casbin.Enforcer:
-    """Casbinエンフォーサーのシングルトンインスタンスを取得"""
-    global _enforcer
-    if _enforcer is None:
-        _enforcer = get_casbin_enforcer()
-    return _enforcer
+    """Casbinエンフォーサーの共有インスタンスを取得"""
+    return registry.get()
 
 
 def casbin_check_permission(username: str, resource: str, action: str) -> bool:
@@ -165,25 +159,22 @@ def is_accounting(username: str) -> bool:
 
 
 # ポリシー管理関数
-def add_role_for_user(username: str, role: str) -> bool:
-    """ユーザーにロールを追加"""
-    enforcer = get_enforcer()
-    return enforcer.add_role_for_user(username, role)
+# （共有エンフォーサーは読み取り専用のため、データベースへ書き込んでから差分を共有エンフォーサーへ適用する）
+def add_role_for_user(username: str, role: str, domain: str) -> bool:
+    """ユーザーにドメイン（例: corporation_1）でのロールを追加"""
+    return save_policy_delta("g", added=[(username, role, domain)])
 
 
-def delete_role_for_user(username: str, role: str) -> bool:
-    """ユーザーからロールを削除"""
-    enforcer = get_enforcer()
-    return enforcer.delete_role_for_user(username, role)
+def delete_role_for_user(username: str, role: str, domain: str) -> bool:
+    """ユーザーからドメインでのロールを削除"""
+    return save_policy_delta("g", removed=[(username, role, domain)])
 
 
-def add_permission_for_role(role: str, resource: str, action: str) -> bool:
-    """ロールに権限を追加"""
-    enforcer = get_enforcer()
-    return enforcer.add_policy(role, resource, action)
+def add_permission_for_role(role: str, resource: str, action: str, domain: str = TEMPLATE_DOMAIN) -> bool:
+    """ロールに権限を追加（既定は全ドメイン共通のロールテンプレート）"""
+    return save_policy_delta("p", added=[(role, domain, resource, action)])
 
 
-def delete_permission_for_role(role: str, resource: str, action: str) -> bool:
+def delete_permission_for_role(role: str, resource: str, action: str, domain: str = TEMPLATE_DOMAIN) -> bool:
     """ロールから権限を削除"""
-    enforcer = get_enforcer()
-    return enforcer.remove_policy(role, resource, action)
\ No newline at end of file
+    return save_policy_delta("p", removed=[(role, domain, resource, action)])
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+スレッドセーフなエンフォーサーラッパー
+
+FastAPIのスレッドプールから同時に enforce が呼ばれる一方で、ロールの同期（差分の適用）やドメインの読み込みなどで
+ポリシーが変更されるため、共有エンフォーサーをコピーオンライトで更新する。
+- 読み取り（enforce / get_* など）: ロックなしで現在のスナップショットを参照
+- 書き込み（update / ドメインの読み込み・破棄）: 書き込みロック下でスナップショットを複製して変更し、
+  インデックス構築まで済ませてから参照を差し替える
+- ポリシー変更メソッド（add_* / remove_* / save_policy など）: 共有エンフォーサーはデータベースへ保存しないため
+  例外にする（casbin_config.save_policy_delta でデータベースへ書き込んでから差分を適用する）
+読み取り中のスナップショットは変更されないため、判定が書き込みの途中状態を見ることはない。
+
+casbin_ruleからの再読み込み（reload）は、ファクトリーから新しいエンフォーサー（モデル・ロールマネージャー・
+コンパイル済みインデックス）を書き込みロックの外で構築し、ロック下では参照の差し替えのみ行う。
+再読み込み中も判定は直前のスナップショットで継続し、差分の書き込みも待たされない。
+
+revision_reader を渡した場合は、読み込んだスナップショットのポリシーリビジョン
+（policy_revision）を記録し、reload_if_stale でリビジョンが進んだときのみ再読み込みする。
+"""
+import threading
+import time
+from typing import Callable, Iterable, Optional, TypeVar
+
+import casbin
+
+T = TypeVar("T")
+
+# スナップショットを変更しない読み取りメソッド（ロックなしで現在のスナップショットに委譲する）
+READ_PREFIXES = ("get_", "has_", "enforce", "batch_enforce")
+READ_METHODS = frozenset({"is_filtered", "new_enforce_context", "new_model"})
+
+# データベースと無関係にメモリ上の状態のみを変更するメソッド（複製して実行する）
+MEMORY_METHODS = frozenset({"ensure_domain", "evict_domain", "build_role_links"})
+
+
+class ConcurrentEnforcer:
+    """
+    コピーオンライトで更新するエンフォーサーラッパー
+
+    ラップするエンフォーサーは clone() を実装している必要がある（decision_cache.CachedEnforcer 以降）。
+    属性と読み取りメソッド（READ_PREFIXES / READ_METHODS）は現在のスナップショットに委譲し、
+    MEMORY_METHODS は update で複製に対して実行する。それ以外のメソッドは呼び出すと RuntimeError になる。
+    """
+
+    def __init__(
+        self,
+        enforcer: casbin.Enforcer,
+        revision_reader: Optional[Callable[[], int]] = None,
+        revision: Optional[int] = None,
+        factory: Optional[Callable[[], casbin.Enforcer]] = None
+    ):
+        """
+        Args:
+            enforcer: ポリシーを読み込み済みのエンフォーサー
+            revision_reader: 現在のポリシーリビジョンを返す関数
+            revision: enforcer を読み込む直前に取得したリビジョン
+            factory: 再読み込み時に新しいエンフォーサーを構築する関数（enforcer と同じ構成）
+        """
+        self._prepare(enforcer)
+        self._snapshot = enforcer
+        self._write_lock = threading.Lock()
+        self.version = 0
+        self._revision_reader = revision_reader
+        self.revision = revision
+        self._factory = factory
+
+        # 再読み込みの状態（バックグラウンド実行中の要求はまとめて1回にする）
+        self._reload_lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._reload_pending = False
+        self.reload_count = 0
+        self.last_reload_seconds: Optional[float] = None
+        self.last_reload_at: Optional[float] = None
+
+    @property
+    def snapshot(self) -> casbin.Enforcer:
+        """現在のスナップショット（参照中に変更されることはない）"""
+        return self._snapshot
+
+    def snapshot_for(self, domain: str) -> casbin.Enforcer:
+        """ドメインのポリシーを読み込み済みのスナップショット（ドメイン単位読み込みの場合）"""
+        snapshot = self._snapshot
+        has_domain = getattr(snapshot, "has_domain", None)
+        if has_domain is None:
+            return snapshot
+        if has_domain(domain):
+            # 読み込み済み: LRUの順序のみ更新
+            snapshot.ensure_domain(domain)
+            return snapshot
+
+        def load(enforcer):
+            enforcer.ensure_domain(domain)
+            return enforcer
+        return self.update(load)
+
+    def enforce(self, *rvals) -> bool:
+        if len(rvals) == 4:
+            return self.snapshot_for(rvals[1]).enforce(*rvals)
+        return self._snapshot.enforce(*rvals)
+
+    def update(self, func: Callable[[casbin.Enforcer], T], written_revisions: Iterable[int] = ()) -> T:
+        """
+        スナップショットを複製して func で変更し、差し替える
+
+        複数の変更を一度の複製でまとめて適用したい場合に直接呼び出す。
+
+        Args:
+            func: 複製したエンフォーサーを変更する関数
+            written_revisions: 同じ変更をデータベースへ書き込んだ際に進めたリビジョン。
+                読み込み済みのリビジョンから連続している（他のワーカーの変更を挟んでいない）場合は
+                最後のリビジョンを読み込み済みとして記録し、reload_if_stale で再読み込みしない
+        """
+        with self._write_lock:
+            clone = self._snapshot.clone()
+            result = func(clone)
+            self._prepare(clone)
+            self._snapshot = clone
+            self.version += 1
+            self._advance_revision(written_revisions)
+            return result
+
+    def _advance_revision(self, written_revisions: Iterable[int]) -> None:
+        revisions = sorted(written_revisions)
+        if not revisions or self.revision is None:
+            return
+        if revisions == list(range(self.revision + 1, self.revision + 1 + len(revisions))):
+            self.revision = revisions[-1]
+
+    def reload(self) -> None:
+        """
+        casbin_ruleから新しいスナップショットを構築して差し替える
+
+        データベースからの読み込みとインデックス構築は書き込みロックの外で行い、
+        ロック下では判定キャッシュの引き継ぎと参照の差し替えのみ行う。
+        """
+        start = time.perf_counter()
+        # 読み込み中の書き込みを取りこぼさないよう、リビジョンは読み込みの前に取得する
+        # （取りこぼした場合もリビジョンが進んでいるため次回の確認で再読み込みされる）
+        revision = self._revision_reader() if self._revision_reader else None
+        fresh = self._load_fresh()
+        self._prepare(fresh)
+
+        with self._write_lock:
+            inherit = getattr(fresh, "inherit_decision_cache", None)
+            if inherit is not None:
+                inherit(self._snapshot)
+            self._snapshot = fresh
+            self.version += 1
+            self.revision = revision
+        self.reload_count += 1
+        self.last_reload_seconds = time.perf_counter() - start
+        self.last_reload_at = time.time()
+
+    def _load_fresh(self) -> casbin.Enforcer:
+        """casbin_ruleを読み込んだ新しいエンフォーサー（ドメイン単位読み込みでは読み込み済みのドメインも読み込む）"""
+        if self._factory is None:
+            # ファクトリーがない場合は現在のスナップショットの複製に読み込み直す
+            fresh = self._snapshot.clone()
+            fresh.load_policy()
+            return fresh
+
+        fresh = self._factory()
+        load_domains = getattr(fresh, "load_domains", None)
+        if load_domains is not None:
+            load_domains(getattr(self._snapshot, "loaded_domains", ()))
+        return fresh
+
+    def reload_if_stale(self, revision: int) -> bool:
+        """
+        読み込み済みのリビジョンと異なる場合のみ再読み込み
+
+        Args:
+            revision: データベースから取得した現在のリビジョン
+
+        Returns:
+            bool: 再読み込みした場合True
+        """
+        if revision == self.revision:
+            return False
+        self.reload()
+        return True
+
+    # 共有エンフォーサーの load_policy はメモリ上のモデルを直接書き換えず、差し替えで反映する
+    load_policy = reload
+
+    def reload_in_background(self) -> threading.Thread:
+        """
+        バックグラウンドスレッドで再読み込み
+
+        実行中に再度呼ばれた場合は、完了後にもう一度だけ再読み込みする。
+        """
+        with self._reload_lock:
+            if self._reload_thread is not None:
+                self._reload_pending = True
+                return self._reload_thread
+            self._reload_thread = threading.Thread(
+                target=self._reload_worker, name="casbin-policy-reload", daemon=True
+            )
+            self._reload_thread.start()
+            return self._reload_thread
+
+    def _reload_worker(self) -> None:
+        while True:
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Error reloading Casbin policies: {e}")
+            with self._reload_lock:
+                if not self._reload_pending:
+                    self._reload_thread = None
+                    return
+                self._reload_pending = False
+
+    def __getattr__(self, name):
+        value = getattr(self._snapshot, name)
+        if not callable(value) or name.startswith(READ_PREFIXES) or name in READ_METHODS:
+            return value
+
+        if name in MEMORY_METHODS:
+            def write(*args, **kwargs):
+                return self.update(lambda enforcer: getattr(enforcer, name)(*args, **kwargs))
+            return write
+
+        def unsupported(*args, **kwargs):
+            # 複製に適用してもデータベースには保存されず、次の再読み込みで失われるため
+            raise RuntimeError(
+                f"{name}() is not supported on the shared read-only enforcer; "
+                "write with casbin_config.save_policy_delta() or use update()"
+            )
+        return unsupported
+
+    @staticmethod
+    def _prepare(enforcer: casbin.Enforcer) -> None:
+        """公開前にインデックスを構築しておく（読み取り側で構築させない）"""
+        if hasattr(enforcer, "_index_dirty"):
+            enforcer.index
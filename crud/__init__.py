@@ -3,6 +3,7 @@ from .users import (
     verify_password,
     get_user,
     get_user_by_username,
+    get_user_for_auth,
     get_user_by_email,
     get_users,
     create_user,
@@ -61,7 +62,8 @@ from .roles import (
 
 __all__ = [
     # Users
-    "get_password_hash", "verify_password", "get_user", "get_user_by_username", "get_user_by_email",
+    "get_password_hash", "verify_password", "get_user", "get_user_by_username", "get_user_for_auth",
+    "get_user_by_email",
     "get_users", "create_user", "update_user", "delete_user", "get_users_by_corporation",
     # Corporations
     "get_corporation", "get_corporation_by_name", "get_corporation_by_code",
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 import models
+from pagination import paginate
 from schemas.corporations import CorporationCreate, CorporationUpdate
 
 
@@ -15,8 +16,8 @@ def get_corporation_by_code(db: Session, code: str):
     return db.query(models.Corporation).filter(models.Corporation.code == code).first()
 
 
-def get_corporations(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Corporation).offset(skip).limit(limit).all()
+def get_corporations(db: Session, skip: int = 0, limit: int = 100, after: int = None):
+    return paginate(db.query(models.Corporation), models.Corporation.id, skip, limit, after).all()
 
 
 def create_corporation(db: Session, corporation: CorporationCreate):
@@ -1,38 +1,46 @@
 from sqlalchemy.orm import Session
 import models
+from pagination import paginate
 from schemas.inquiries import InquiryCreate, InquiryUpdate, InquiryStatusUpdate
 
 
-def get_inquiry(db: Session, inquiry_id: int, corporation_id: int = None):
+def get_inquiry(db: Session, inquiry_id: int, corporation_id: int = None, authorized=None):
     """
     マルチテナント対応の問い合わせ個別取得
     corporation_id が指定された場合、そのテナントのデータのみを返す
+    authorized（policy_query.authorization_filter の式）が指定された場合、認可済みの行のみを返す
     """
     query = db.query(models.Inquiry).filter(models.Inquiry.id == inquiry_id)
 
     # マルチテナントフィルタリング（必須）
     if corporation_id is not None:
         query = query.filter(models.Inquiry.corporation_id == corporation_id)
+    if authorized is not None:
+        query = query.filter(authorized)
 
     return query.first()
 
 
-def get_inquiries(db: Session, skip: int = 0, limit: int = 100, status: str = None, priority: str = None, corporation_id: int = None):
+def get_inquiries(db: Session, skip: int = 0, limit: int = 100, status: str = None, priority: str = None, corporation_id: int = None, authorized=None, after: int = None):
     """
     マルチテナント対応の問い合わせ一覧取得
     corporation_id が指定された場合、そのテナントのデータのみを返す
+    authorized（policy_query.authorization_filter の式）が指定された場合、認可済みの行のみを返す
+    after（前のページの最後のID）が指定された場合、skipの代わりにキーセットで次のページを返す
     """
     query = db.query(models.Inquiry)
 
     # マルチテナントフィルタリング（必須）
     if corporation_id is not None:
         query = query.filter(models.Inquiry.corporation_id == corporation_id)
+    if authorized is not None:
+        query = query.filter(authorized)
 
     if status:
         query = query.filter(models.Inquiry.status == status)
     if priority:
         query = query.filter(models.Inquiry.priority == priority)
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, models.Inquiry.id, skip, limit, after).all()
 
 
 def get_inquiries_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 import models
 from schemas.roles import RoleCreate, RoleUpdate, RolePermissionCreate
 
@@ -100,7 +100,7 @@ def remove_role_permission(db: Session, role_id: int, permission_id: int):
 # ユーザーロール管理
 def get_user_roles(db: Session, user_id: int):
     """ユーザーロール一覧取得"""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = db.query(models.User).options(joinedload(models.User.role)).filter(models.User.id == user_id).first()
     if not user or not user.role:
         return []
 
@@ -118,9 +118,11 @@ def assign_user_role(db: Session, user_id: int, role_id: int):
     user.role_id = role_id
     db.commit()
 
-    # Casbinポリシーも更新
+    # Casbinポリシーと認証キャッシュも更新
     from casbin_config import sync_user_roles_to_casbin
-    sync_user_roles_to_casbin()
+    from principal import invalidate_user_principal
+    sync_user_roles_to_casbin(user_id=user_id)
+    invalidate_user_principal(user_id)
 
     return True
 
@@ -135,8 +137,10 @@ def unassign_user_role(db: Session, user_id: int, role_id: int):
     user.role_id = None
     db.commit()
 
-    # Casbinポリシーも更新
+    # Casbinポリシーと認証キャッシュも更新
     from casbin_config import sync_user_roles_to_casbin
-    sync_user_roles_to_casbin()
+    from principal import invalidate_user_principal
+    sync_user_roles_to_casbin(user_id=user_id)
+    invalidate_user_principal(user_id)
 
     return True
\ No newline at end of file
@@ -1,43 +1,50 @@
 from sqlalchemy.orm import Session
 import models
+from pagination import paginate
 from schemas.shops import ShopCreate, ShopUpdate
 
 
-def get_shop(db: Session, shop_id: int, corporation_id: int = None):
+def get_shop(db: Session, shop_id: int, corporation_id: int = None, authorized=None):
     """
     マルチテナント対応の店舗個別取得
     corporation_id が指定された場合、そのテナントのデータのみを返す
+    authorized（policy_query.authorization_filter の式）が指定された場合、認可済みの行のみを返す
     """
     query = db.query(models.Shop).filter(models.Shop.id == shop_id)
 
     # マルチテナントフィルタリング
     if corporation_id is not None:
         query = query.filter(models.Shop.corporation_id == corporation_id)
+    if authorized is not None:
+        query = query.filter(authorized)
 
     return query.first()
 
 
-def get_shops(db: Session, skip: int = 0, limit: int = 100, corporation_id: int = None):
+def get_shops(db: Session, skip: int = 0, limit: int = 100, corporation_id: int = None, authorized=None, after: int = None):
     """
     マルチテナント対応の店舗一覧取得
     corporation_id が指定された場合、そのテナントのデータのみを返す
+    authorized（policy_query.authorization_filter の式）が指定された場合、認可済みの行のみを返す
+    after（前のページの最後のID）が指定された場合、skipの代わりにキーセットで次のページを返す
     """
     query = db.query(models.Shop)
 
     # マルチテナントフィルタリング
     if corporation_id is not None:
         query = query.filter(models.Shop.corporation_id == corporation_id)
+    if authorized is not None:
+        query = query.filter(authorized)
 
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, models.Shop.id, skip, limit, after).all()
 
 
 
 
-def get_shops_by_corporation(db: Session, corporation_id: int, skip: int = 0, limit: int = 100):
+def get_shops_by_corporation(db: Session, corporation_id: int, skip: int = 0, limit: int = 100, after: int = None):
     """特定法人の店舗一覧を取得"""
-    return db.query(models.Shop).filter(
-        models.Shop.corporation_id == corporation_id
-    ).offset(skip).limit(limit).all()
+    query = db.query(models.Shop).filter(models.Shop.corporation_id == corporation_id)
+    return paginate(query, models.Shop.id, skip, limit, after).all()
 
 
 def create_shop(db: Session, shop: ShopCreate):
@@ -49,9 +56,9 @@ def create_shop(db: Session, shop: ShopCreate):
     return db_shop
 
 
-def update_shop(db: Session, shop_id: int, shop: ShopUpdate, corporation_id: int = None):
+def update_shop(db: Session, shop_id: int, shop: ShopUpdate, corporation_id: int = None, authorized=None):
     """店舗情報更新"""
-    db_shop = get_shop(db, shop_id, corporation_id)
+    db_shop = get_shop(db, shop_id, corporation_id, authorized)
     if not db_shop:
         return None
 
@@ -64,9 +71,9 @@ def update_shop(db: Session, shop_id: int, shop: ShopUpdate, corporation_id: int
     return db_shop
 
 
-def delete_shop(db: Session, shop_id: int, corporation_id: int = None):
+def delete_shop(db: Session, shop_id: int, corporation_id: int = None, authorized=None):
     """店舗削除"""
-    db_shop = get_shop(db, shop_id, corporation_id)
+    db_shop = get_shop(db, shop_id, corporation_id, authorized)
     if db_shop:
         db.delete(db_shop)
         db.commit()
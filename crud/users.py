@@ -1,10 +1,15 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from passlib.context import CryptContext
 import models
+from pagination import paginate
 from schemas.users import UserCreate, UserUpdate
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# レスポンスモデル（schemas.User）が参照するロールは事前に読み込む
+# （遅延ロードのままだと、一覧のシリアライズ時にロールごとに1クエリ発行される）
+_with_role = selectinload(models.User.role)
+
 
 def get_password_hash(password: str):
     return pwd_context.hash(password)
@@ -15,19 +20,27 @@ def verify_password(plain_password: str, hashed_password: str):
 
 
 def get_user(db: Session, user_id: int):
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return db.query(models.User).options(_with_role).filter(models.User.id == user_id).first()
 
 
 def get_user_by_username(db: Session, username: str):
-    return db.query(models.User).filter(models.User.username == username).first()
+    return db.query(models.User).options(_with_role).filter(models.User.username == username).first()
+
+
+def get_user_for_auth(db: Session, username: str):
+    """認証用: ロール・法人をeager loadしてユーザーを取得（1クエリ）"""
+    return db.query(models.User).options(
+        joinedload(models.User.role),
+        joinedload(models.User.corporation)
+    ).filter(models.User.username == username).first()
 
 
 def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+    return db.query(models.User).options(_with_role).filter(models.User.email == email).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, after: int = None):
+    return paginate(db.query(models.User).options(_with_role), models.User.id, skip, limit, after).all()
 
 
 def create_user(db: Session, user: UserCreate):
@@ -55,22 +68,42 @@ def update_user(db: Session, user_id: int, user: UserUpdate):
         update_data["hashed_password"] = get_password_hash(update_data["password"])
         del update_data["password"]
 
+    old_username = db_user.username
     for key, value in update_data.items():
         setattr(db_user, key, value)
 
     db.commit()
     db.refresh(db_user)
+
+    # ユーザー名・ロール・法人が変わった場合はCasbinのgルールを同期（改名前の名前の行は削除）
+    if update_data.keys() & {"username", "role_id", "corporation_id"}:
+        from casbin_config import sync_user_roles_to_casbin
+        removed = [old_username] if old_username != db_user.username else []
+        sync_user_roles_to_casbin(user_id=user_id, removed_usernames=removed)
+
+    # 認証キャッシュ上の古いスナップショットを破棄
+    from principal import invalidate_user_principal
+    invalidate_user_principal(user_id)
     return db_user
 
 
 def delete_user(db: Session, user_id: int):
     db_user = get_user(db, user_id)
     if db_user:
+        username = db_user.username
         db.delete(db_user)
         db.commit()
+
+        # 削除したユーザーのgルールを削除
+        from casbin_config import sync_user_roles_to_casbin
+        sync_user_roles_to_casbin(user_id=user_id, removed_usernames=[username])
+
+        from principal import invalidate_user_principal
+        invalidate_user_principal(user_id)
         return True
     return False
 
 
-def get_users_by_corporation(db: Session, corporation_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.User).filter(models.User.corporation_id == corporation_id).offset(skip).limit(limit).all()
\ No newline at end of file
+def get_users_by_corporation(db: Session, corporation_id: int, skip: int = 0, limit: int = 100, after: int = None):
+    query = db.query(models.User).options(_with_role).filter(models.User.corporation_id == corporation_id)
+    return paginate(query, models.User.id, skip, limit, after).all()
\ No newline at end of file
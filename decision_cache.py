@@ -0,0 +1,274 @@
+"""
+Casbin認可判定のキャッシュ
+
+enforce(sub, dom, obj, act) の結果をLRU + TTLでメモ化する。
+ポリシー変更時はルールに関係するサブジェクト・ドメインのエントリのみを無効化する。
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import casbin
+
+from casbin_config import TEMPLATE_DOMAIN
+
+# キャッシュの既定値
+DEFAULT_MAXSIZE = 10000
+DEFAULT_TTL = 300.0  # 秒
+
+DecisionKey = Tuple[str, str, str, str]
+
+
+class DecisionCache:
+    """(sub, dom, obj, act) → bool のLRU/TTLキャッシュ"""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[DecisionKey, Tuple[bool, float]]" = OrderedDict()
+        self._by_subject: Dict[str, Set[DecisionKey]] = {}
+        self._by_domain: Dict[str, Set[DecisionKey]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: DecisionKey) -> Optional[bool]:
+        """キャッシュ済みの判定結果を取得（未登録・期限切れの場合はNone）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: DecisionKey, value: bool) -> None:
+        """判定結果を登録"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                self._by_subject.setdefault(key[0], set()).add(key)
+                self._by_domain.setdefault(key[1], set()).add(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_subject(self, subject: str, domain: Optional[str] = None) -> None:
+        """サブジェクトのエントリを無効化（domain指定時はそのドメインのみ）"""
+        with self._lock:
+            keys = [
+                key for key in self._by_subject.get(subject, ())
+                if domain is None or key[1] == domain
+            ]
+            self._discard_all(keys)
+
+    def invalidate_domain(self, domain: str) -> None:
+        """ドメインのエントリをすべて無効化"""
+        with self._lock:
+            self._discard_all(list(self._by_domain.get(domain, ())))
+
+    def clear(self) -> None:
+        """全エントリを無効化"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_subject.clear()
+            self._by_domain.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def copy(self) -> "DecisionCache":
+        """エントリ・統計情報を引き継いだ複製（コピーオンライト用）"""
+        clone = DecisionCache(self.maxsize, self.ttl)
+        with self._lock:
+            clone.hits = self.hits
+            clone.misses = self.misses
+            clone.invalidations = self.invalidations
+            clone._entries = OrderedDict(self._entries)
+            clone._by_subject = {key: set(keys) for key, keys in self._by_subject.items()}
+            clone._by_domain = {key: set(keys) for key, keys in self._by_domain.items()}
+        return clone
+
+    def stats(self) -> dict:
+        """ヒット・ミス数などの統計情報"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def _discard_all(self, keys: Iterable[DecisionKey]) -> None:
+        for key in keys:
+            self._discard(key)
+
+    def _discard(self, key: DecisionKey) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        self.invalidations += 1
+        for index, value in ((self._by_subject, key[0]), (self._by_domain, key[1])):
+            keys = index.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[value]
+
+
+class CachedEnforcer(casbin.Enforcer):
+    """
+    判定キャッシュ付きエンフォーサー
+
+    add_policy / add_grouping_policy / remove_policy などのポリシー変更や
+    load_policy による再読み込みを検知し、変更されたルールに関係するエントリのみを無効化する。
+    """
+
+    def __init__(self, *args, cache: Optional[DecisionCache] = None, **kwargs):
+        self.decision_cache = cache or DecisionCache()
+        super().__init__(*args, **kwargs)
+
+    def enforce(self, *rvals):
+        if len(rvals) != 4:
+            return super().enforce(*rvals)
+
+        key = tuple(rvals)
+        result = self.decision_cache.get(key)
+        if result is None:
+            result = super().enforce(*rvals)
+            self.decision_cache.set(key, result)
+        return result
+
+    def clone(self) -> "CachedEnforcer":
+        """
+        ポリシー・ロールリンク・判定キャッシュを複製したエンフォーサー（コピーオンライト用）
+
+        アダプター・関数マップなどの設定は共有し、モデルとロールマネージャーのみ新しく作る。
+        複製への変更は元のエンフォーサーに影響しない。
+        """
+        clone = copy.copy(self)
+        clone.model = copy.deepcopy(self.model)
+        clone.rm_map = {}
+        clone.cond_rm_map = {}
+        clone.init_rm_map()
+        if clone.auto_build_role_links:
+            clone.build_role_links()
+        clone.decision_cache = self.decision_cache.copy()
+        return clone
+
+    def inherit_decision_cache(self, previous: casbin.Enforcer) -> None:
+        """
+        再読み込みで新しく構築したエンフォーサーに、直前のスナップショットの判定キャッシュを引き継ぐ
+
+        load_policy と同様に、ルールが変わったエントリのみ無効化する。
+        """
+        cache = getattr(previous, "decision_cache", None)
+        if cache is None:
+            return
+        self.decision_cache = cache.copy()
+        if len(self.decision_cache) == 0:
+            return
+        # インデックスは新しいルールで構築済みのため、判定キャッシュのみ無効化する
+        CachedEnforcer._invalidate_rules(self, previous._policy_rules() ^ self._policy_rules())
+
+    def load_policy(self):
+        if len(self.decision_cache) == 0:
+            return super().load_policy()
+
+        before = self._policy_rules()
+        super().load_policy()
+        self._invalidate_rules(before ^ self._policy_rules())
+
+    def clear_policy(self):
+        super().clear_policy()
+        self.decision_cache.clear()
+
+    def _add_policy(self, sec, ptype, rule):
+        added = super()._add_policy(sec, ptype, rule)
+        if added:
+            self._invalidate_rules([(sec, tuple(rule))])
+        return added
+
+    def _add_policies(self, sec, ptype, rules):
+        added = super()._add_policies(sec, ptype, rules)
+        if added:
+            self._invalidate_rules((sec, tuple(rule)) for rule in rules)
+        return added
+
+    def _remove_policy(self, sec, ptype, rule):
+        removed = super()._remove_policy(sec, ptype, rule)
+        if removed:
+            self._invalidate_rules([(sec, tuple(rule))])
+        return removed
+
+    def _remove_policies(self, sec, ptype, rules):
+        removed = super()._remove_policies(sec, ptype, rules)
+        if removed:
+            self._invalidate_rules((sec, tuple(rule)) for rule in rules)
+        return removed
+
+    def _remove_filtered_policy(self, sec, ptype, field_index, *field_values):
+        rules = self.model.get_filtered_policy(sec, ptype, field_index, *field_values)
+        removed = super()._remove_filtered_policy(sec, ptype, field_index, *field_values)
+        if removed:
+            self._invalidate_rules((sec, tuple(rule)) for rule in rules)
+        return removed
+
+    def _update_policy(self, sec, ptype, old_rule, new_rule):
+        updated = super()._update_policy(sec, ptype, old_rule, new_rule)
+        if updated:
+            self._invalidate_rules([(sec, tuple(old_rule)), (sec, tuple(new_rule))])
+        return updated
+
+    def _policy_rules(self) -> Set[Tuple[str, tuple]]:
+        """現在のp/gルールを (sec, rule) の集合として取得"""
+        rules = set()
+        for sec in ("p", "g"):
+            if sec not in self.model.keys():
+                continue
+            for assertion in self.model[sec].values():
+                rules.update((sec, tuple(rule)) for rule in assertion.policy)
+        return rules
+
+    def _invalidate_rules(self, rules: Iterable[Tuple[str, tuple]]) -> None:
+        """
+        変更されたルールに関係するエントリを無効化
+
+        - p: (sub, dom, obj, act)  サブジェクトがロールならドメイン全体（テンプレートなら全体）
+        - g: (user, role, dom)     ユーザーならそのユーザー、ロール継承ならドメイン全体
+        """
+        if len(self.decision_cache) == 0:
+            return
+
+        roles = {rule[1] for rule in self.get_grouping_policy() if len(rule) >= 2}
+        for sec, rule in rules:
+            if not rule:
+                continue
+            subject = rule[0]
+            if sec == "p":
+                domain = rule[1] if len(rule) >= 4 else None
+            else:
+                domain = rule[2] if len(rule) >= 3 else None
+
+            if subject in roles:
+                # ドメイン不明・ロールテンプレート（"*"）の変更は全ドメインに影響する
+                if domain is None or domain == TEMPLATE_DOMAIN:
+                    self.decision_cache.clear()
+                    return
+                self.decision_cache.invalidate_domain(domain)
+            else:
+                self.decision_cache.invalidate_subject(subject, domain)
@@ -2,7 +2,7 @@ from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 import models
 from auth import get_current_user
-from casbin_config import get_casbin_enforcer
+from enforcer_registry import get_enforcer
 from database import get_db
 
 
@@ -24,21 +24,8 @@ def verify_corporation_access(corporation_id: int):
                 detail="Access denied: You can only access your own corporation's data"
             )
 
-        # Casbinでの追加権限チェック（将来的な拡張用）
-        enforcer = get_casbin_enforcer()
-
-        # ユーザーに法人読み取り権限があるかチェック
-        subject = f"user:{current_user.id}"
-        object_name = f"corporation:{corporation_id}"
-        action = "read"
-
-        # 基本権限（所属法人チェック）が通った場合、Casbinでの追加チェック
-        # 今回は所属法人チェックが主要な制御なので、Casbinは補助的に使用
-        if not enforcer.enforce(subject, object_name, action):
-            # 所属法人メンバーとしての基本権限を動的に追加
-            enforcer.add_grouping_policy(f"user:{current_user.id}", "corporation_member")
-            enforcer.add_policy("corporation_member", f"corporation:{corporation_id}", "read")
-
+        # 所属法人チェックが主要な制御のため、Casbinでの権限の自動付与は行わない
+        # （共有エンフォーサーは読み取り専用で、付与してもデータベースに保存されず再読み込みで失われるため）
         return current_user
 
     return _verify_access
@@ -67,7 +54,7 @@ def verify_corporation_management_access(corporation_id: int):
             )
 
         # Casbinでの管理権限チェック
-        enforcer = get_casbin_enforcer()
+        enforcer = get_enforcer()
         subject = f"user:{current_user.id}"
         object_name = f"corporation:{corporation_id}"
         action = "write"
@@ -0,0 +1,269 @@
+"""
+プロセス共通のCasbinエンフォーサーレジストリ
+
+エンフォーサーはアプリ起動時に一度だけ構築し、全ルーター・認可関数で共有する。
+モデル名ごとにファクトリーを登録し、ポリシー変更時は reload / refresh で明示的に更新する。
+構築したエンフォーサーは ConcurrentEnforcer でラップし、スレッドプールからの同時アクセスに備える。
+各エンフォーサーは読み込んだ時点のポリシーリビジョンを保持し、reload_if_stale では
+リビジョンが進んでいる場合のみ再読み込みする。
+"""
+import os
+import threading
+from functools import partial
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+
+import casbin
+
+from casbin_config import get_casbin_enforcer
+from concurrent_enforcer import ConcurrentEnforcer
+from decision_cache import CachedEnforcer
+from filtered_enforcer import DEFAULT_MAX_DOMAINS, DOMAIN_FIELD_INDEX, DomainFilteredEnforcer
+from policy_index import CompiledEnforcer
+from policy_revision import get_policy_revision
+
+# ドメインベースRBACモデル（casbin_config.CASBIN_MODEL）
+DEFAULT_MODEL = "domain_rbac"
+
+# 判定モード
+# - compiled: コンパイル済みインデックスで判定（コンパイル不可のモデルは汎用マッチャー）
+# - cached:   汎用マッチャー + 判定キャッシュ
+# - filtered: compiled + ドメイン単位の遅延読み込み（テナント数が多い場合）
+ENFORCER_MODE = os.getenv("CASBIN_ENFORCER_MODE", "compiled")
+
+# filteredモードの設定
+# CASBIN_PRELOAD_DOMAINS: 起動時に読み込むドメイン（カンマ区切り、例: corporation_1,corporation_2）
+# CASBIN_MAX_LOADED_DOMAINS: メモリ上に保持するドメイン数の上限
+PRELOAD_DOMAINS = [d for d in os.getenv("CASBIN_PRELOAD_DOMAINS", "").split(",") if d]
+MAX_LOADED_DOMAINS = int(os.getenv("CASBIN_MAX_LOADED_DOMAINS", DEFAULT_MAX_DOMAINS))
+
+ENFORCER_CLASSES = {
+    "compiled": CompiledEnforcer,
+    "cached": CachedEnforcer,
+    "filtered": partial(
+        DomainFilteredEnforcer,
+        preload_domains=PRELOAD_DOMAINS,
+        max_domains=MAX_LOADED_DOMAINS
+    ),
+}
+
+
+class EnforcerRegistry:
+    """モデル名をキーにエンフォーサーを保持するレジストリ"""
+
+    def __init__(self, revision_reader: Optional[Callable[[], int]] = None):
+        self._factories: Dict[str, Callable[[], casbin.Enforcer]] = {}
+        self._enforcers: Dict[str, ConcurrentEnforcer] = {}
+        self._lock = threading.Lock()
+        self._revision_reader = revision_reader
+
+    def register(self, model_name: str, factory: Callable[[], casbin.Enforcer]) -> None:
+        """モデル名に対するエンフォーサーファクトリーを登録"""
+        with self._lock:
+            self._factories[model_name] = factory
+            self._enforcers.pop(model_name, None)
+
+    def initialize(self) -> None:
+        """登録済みの全モデルのエンフォーサーを構築（アプリ起動時に呼ぶ）"""
+        for model_name in list(self._factories):
+            self.get(model_name)
+
+    def get(self, model_name: str = DEFAULT_MODEL) -> ConcurrentEnforcer:
+        """エンフォーサーを取得（未構築の場合は一度だけ構築し、同時に呼ばれても構築は1回）"""
+        enforcer = self._enforcers.get(model_name)
+        if enforcer is not None:
+            return enforcer
+
+        with self._lock:
+            enforcer = self._enforcers.get(model_name)
+            if enforcer is None:
+                if model_name not in self._factories:
+                    raise KeyError(f"Unknown Casbin model: {model_name}")
+                # 構築中の書き込みを取りこぼさないよう、リビジョンは読み込みの前に取得する
+                revision = self._revision_reader() if self._revision_reader else None
+                enforcer = ConcurrentEnforcer(
+                    self._factories[model_name](),
+                    revision_reader=self._revision_reader,
+                    revision=revision,
+                    factory=self._factories[model_name]
+                )
+                self._enforcers[model_name] = enforcer
+            return enforcer
+
+    def reload(self, model_name: Optional[str] = None, wait: bool = True) -> None:
+        """
+        casbin_ruleテーブルからポリシーを再読み込み
+
+        新しいスナップショットを構築してから差し替えるため、再読み込み中も判定は止まらない。
+
+        Args:
+            model_name: 対象モデル名（Noneの場合は構築済みの全モデル）
+            wait: Falseの場合はバックグラウンドで再読み込みし、完了を待たずに戻る
+        """
+        names = [model_name] if model_name else list(self._enforcers)
+        for name in names:
+            enforcer = self._enforcers.get(name)
+            if enforcer is None:
+                continue
+            if wait:
+                enforcer.reload()
+            else:
+                enforcer.reload_in_background()
+
+    def reload_if_stale(self, revision: int, model_name: Optional[str] = None) -> bool:
+        """
+        読み込み済みのリビジョンが revision と異なるエンフォーサーのみ再読み込み
+
+        Args:
+            revision: データベースから取得した現在のリビジョン
+            model_name: 対象モデル名（Noneの場合は構築済みの全モデル）
+
+        Returns:
+            bool: いずれかを再読み込みした場合True
+        """
+        names = [model_name] if model_name else list(self._enforcers)
+        reloaded = False
+        for name in names:
+            enforcer = self._enforcers.get(name)
+            if enforcer is not None and enforcer.reload_if_stale(revision):
+                reloaded = True
+        return reloaded
+
+    def refresh(self, model_name: Optional[str] = None) -> None:
+        """
+        エンフォーサーをファクトリーから作り直す（モデル定義の変更時など）
+
+        Args:
+            model_name: 対象モデル名（Noneの場合は登録済みの全モデル）
+        """
+        names = [model_name] if model_name else list(self._factories)
+        with self._lock:
+            for name in names:
+                self._enforcers.pop(name, None)
+        for name in names:
+            self.get(name)
+
+
+def _build_domain_rbac_enforcer() -> casbin.Enforcer:
+    """判定モードに応じた読み取り専用エンフォーサーを構築"""
+    return get_casbin_enforcer(
+        enforcer_class=ENFORCER_CLASSES[ENFORCER_MODE],
+        filtered=ENFORCER_MODE == "filtered"
+    )
+
+
+# プロセス共通のレジストリ
+registry = EnforcerRegistry(revision_reader=get_policy_revision)
+registry.register(DEFAULT_MODEL, _build_domain_rbac_enforcer)
+
+
+def get_enforcer(model_name: str = DEFAULT_MODEL) -> ConcurrentEnforcer:
+    """共有エンフォーサーを取得"""
+    return registry.get(model_name)
+
+
+def reload_policies(model_name: Optional[str] = None, wait: bool = True) -> None:
+    """共有エンフォーサーのポリシーをデータベースから再読み込み（wait=Falseでバックグラウンド実行）"""
+    registry.reload(model_name, wait=wait)
+
+
+def get_loaded_policy_revision(model_name: str = DEFAULT_MODEL) -> Optional[int]:
+    """共有エンフォーサーが読み込んでいるポリシーリビジョンを取得"""
+    return registry.get(model_name).revision
+
+
+def get_decision_cache_stats(model_name: str = DEFAULT_MODEL) -> dict:
+    """
+    共有エンフォーサーの判定キャッシュ統計（ヒット・ミス数）を取得
+
+    判定キャッシュが使われるのは cached モード（およびコンパイルできないモデル）のみ。
+    compiled / filtered モードではコンパイル済みインデックスで判定するため参照されず、
+    active=False でヒット・ミス数は増えない。
+    """
+    enforcer = registry.get(model_name)
+    cache = getattr(enforcer, "decision_cache", None)
+    if cache is None:
+        return {}
+    return {
+        **cache.stats(),
+        "mode": ENFORCER_MODE,
+        "active": getattr(enforcer, "index", None) is None,
+    }
+
+
+def apply_grouping_delta(
+    added,
+    removed,
+    model_name: str = DEFAULT_MODEL,
+    written_revisions: Iterable[int] = ()
+) -> None:
+    """
+    データベースへ反映済みのgルール差分を共有エンフォーサーのメモリ上に適用
+
+    全件の再読み込みを行わず、判定キャッシュも変更されたサブジェクトのみ無効化される。
+
+    Args:
+        written_revisions: 差分をデータベースへ書き込んだ際に進めたリビジョン
+            （ConcurrentEnforcer.update を参照。ウォッチャーが自分の変更を再読み込みしないようにする）
+    """
+    # ドメインなしの旧形式のルールはデータベースから直接削除済みのため、メモリ上の削除は行わない
+    apply_policy_delta(
+        "g", added, [rule for rule in removed if len(rule) == 3],
+        model_name=model_name, written_revisions=written_revisions
+    )
+
+
+def apply_policy_delta(
+    ptype: str,
+    added,
+    removed,
+    model_name: str = DEFAULT_MODEL,
+    written_revisions: Iterable[int] = ()
+) -> None:
+    """
+    データベースへ反映済みの p / g ルール差分を共有エンフォーサーのメモリ上に適用
+
+    Args:
+        ptype: "p" または "g"
+        added: 追加したルール
+        removed: 削除したルール
+        written_revisions: apply_grouping_delta を参照
+    """
+    if not added and not removed:
+        return
+    field_index = DOMAIN_FIELD_INDEX[ptype]
+
+    def apply(enforcer):
+        # ドメイン単位読み込みの場合、未読み込みのドメインは初回アクセス時にデータベースから読み込まれる
+        has_domain = getattr(enforcer, "has_domain", None)
+        if ptype == "g":
+            add, remove = enforcer.add_named_grouping_policy, enforcer.remove_named_grouping_policy
+        else:
+            add, remove = enforcer.add_named_policy, enforcer.remove_named_policy
+        for rule in removed:
+            remove(ptype, *rule)
+        for rule in added:
+            if has_domain is None or len(rule) <= field_index or has_domain(rule[field_index]):
+                add(ptype, *rule)
+
+    # 差分はまとめて1回のコピーオンライトで適用する
+    registry.get(model_name).update(apply, written_revisions=written_revisions)
+
+
+def is_domain_loaded(domain: Optional[str], model_name: str = DEFAULT_MODEL) -> bool:
+    """
+    ドメインのポリシーがメモリ上にあり、判定でデータベースを参照しないかどうか
+
+    ドメイン単位読み込み（filteredモード）で未読み込みの場合のみFalse。
+    非同期ルーターで、判定をイベントループ上で実行してよいかの確認に使う。
+    """
+    has_domain = getattr(registry.get(model_name).snapshot, "has_domain", None)
+    return has_domain is None or domain is None or has_domain(domain)
+
+
+def get_roles_for_user(username: str, domain: str, model_name: str = DEFAULT_MODEL) -> FrozenSet[str]:
+    """ドメイン内でユーザーが持つロール集合（継承を含み、ユーザー自身は含まない）"""
+    enforcer = registry.get(model_name).snapshot_for(domain)
+    index = getattr(enforcer, "index", None)
+    if index is not None:
+        return index.roles_for(username, domain) - {username}
+    return frozenset(enforcer.get_implicit_roles_for_user(username, domain))
@@ -0,0 +1,133 @@
+"""
+ドメイン単位でポリシーを読み込むエンフォーサー
+
+casbin_ruleはテナント（corporation_{id}）数に比例して増えるため、全件をメモリに載せず、
+ワーカーが実際に扱うドメインの p / g 行のみを読み込む。
+未読み込みのドメインは初回アクセス時に読み込み、上限を超えたら最も使われていないドメインを破棄する。
+ロールテンプレート（dom = "*"）は全ドメイン共通のため常に読み込んでおく。
+"""
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from casbin_config import TEMPLATE_DOMAIN, build_policy_filter
+from policy_index import CompiledEnforcer
+
+# メモリ上に保持するドメイン数の既定値
+DEFAULT_MAX_DOMAINS = 1000
+
+# ドメインが格納される casbin_rule の列（p = sub, dom, obj, act / g = user, role, dom）
+DOMAIN_FIELDS = {"p": "v1", "g": "v2"}
+DOMAIN_FIELD_INDEX = {"p": 1, "g": 2}
+
+
+class DomainFilteredEnforcer(CompiledEnforcer):
+    """
+    ドメイン単位の遅延読み込み・LRU破棄を行うエンフォーサー
+
+    フィルター付きアダプター（Adapter(..., filtered=True)）と組み合わせて使用する。
+    破棄はメモリ上のモデルからのみ行い、データベースには書き込まない。
+    """
+
+    def __init__(
+        self,
+        *args,
+        preload_domains: Optional[Iterable[str]] = None,
+        max_domains: int = DEFAULT_MAX_DOMAINS,
+        **kwargs
+    ):
+        self.max_domains = max_domains
+        self._domains: "OrderedDict[str, None]" = OrderedDict()
+        self._domain_lock = threading.RLock()
+        super().__init__(*args, **kwargs)
+
+        self._load_domain(TEMPLATE_DOMAIN)
+        self.load_domains(preload_domains or ())
+
+    @property
+    def loaded_domains(self) -> List[str]:
+        """読み込み済みドメイン（古い順）"""
+        with self._domain_lock:
+            return list(self._domains)
+
+    def has_domain(self, domain: str) -> bool:
+        """ドメインのポリシーが読み込み済みかどうか"""
+        return domain == TEMPLATE_DOMAIN or domain in self._domains
+
+    def clone(self) -> "DomainFilteredEnforcer":
+        with self._domain_lock:
+            clone = super().clone()
+            clone._domains = OrderedDict(self._domains)
+        clone._domain_lock = threading.RLock()
+        return clone
+
+    def ensure_domain(self, domain: str) -> None:
+        """ドメインのポリシーが未読み込みなら読み込む"""
+        if domain in self._domains:
+            with self._domain_lock:
+                if domain in self._domains:
+                    self._domains.move_to_end(domain)
+                    return
+
+        with self._domain_lock:
+            if domain in self._domains:
+                return
+            self._load_domain(domain)
+            self._domains[domain] = None
+            while len(self._domains) > self.max_domains:
+                self.evict_domain(next(iter(self._domains)))
+
+    def load_domains(self, domains: Iterable[str]) -> None:
+        """未読み込みのドメインをまとめて読み込む（ロールリンク・インデックスの再構築は1回）"""
+        with self._domain_lock:
+            new_domains = [d for d in dict.fromkeys(domains) if not self.has_domain(d)]
+            if not new_domains:
+                return
+            for domain in new_domains:
+                self._load_filtered_rows(domain)
+                self._domains[domain] = None
+                self.decision_cache.invalidate_domain(domain)
+            self.build_role_links()
+            self._index_dirty = True
+            while len(self._domains) > self.max_domains:
+                self.evict_domain(next(iter(self._domains)))
+
+    def evict_domain(self, domain: str) -> None:
+        """ドメインのポリシーをメモリ上から破棄"""
+        with self._domain_lock:
+            self._domains.pop(domain, None)
+            for sec, field_index in DOMAIN_FIELD_INDEX.items():
+                self.model.remove_filtered_policy(sec, sec, field_index, domain)
+            self.build_role_links()
+            self._index_dirty = True
+            self.decision_cache.invalidate_domain(domain)
+
+    def enforce(self, *rvals):
+        if len(rvals) == 4:
+            self.ensure_domain(rvals[1])
+        return super().enforce(*rvals)
+
+    def load_policy(self):
+        """読み込み済みドメインのみを再読み込み"""
+        with self._domain_lock:
+            self.model.clear_policy()
+            for domain in [TEMPLATE_DOMAIN, *self._domains]:
+                self._load_filtered_rows(domain)
+            self.build_role_links()
+            self._index_dirty = True
+            self.decision_cache.clear()
+
+    def _load_domain(self, domain: str) -> None:
+        self._load_filtered_rows(domain)
+        self.build_role_links()
+        self._index_dirty = True
+        self.decision_cache.invalidate_domain(domain)
+
+    def _load_filtered_rows(self, domain: str) -> None:
+        if hasattr(self.adapter, "load_domain_policy"):
+            # インデックスで検索できる1回のクエリで読み込む（RevisionedAdapter）
+            self.adapter.load_domain_policy(self.model, domain, DOMAIN_FIELDS)
+            return
+        for ptype in DOMAIN_FIELDS:
+            policy_filter = build_policy_filter(ptype, **{DOMAIN_FIELDS[ptype]: [domain]})
+            self.adapter.load_filtered_policy(self.model, policy_filter)
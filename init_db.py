@@ -2,12 +2,15 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 from models import Base, User, Corporation, Role
 from database import engine, SessionLocal
+from schema_migrations import ensure_indexes
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def init_database():
     Base.metadata.create_all(bind=engine)
+    for name in ensure_indexes(engine):
+        print(f"Created index: {name}")
     print("Database tables created successfully")
 
     db = SessionLocal()
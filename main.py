@@ -1,12 +1,46 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 import models
-from database import engine
-from routers import users, corporations, shops, inquiries, auth, roles
+from auth import security
+from authorization_manager import admin_authorization_manager
+from database import DB_MODE, engine, pool_metrics
+from enforcer_registry import registry
+from policy_watcher import WATCH_ENABLED, watcher
+from request_metrics import (
+    REQUEST_METRICS_ENABLED, RequestMetricsMiddleware, install_sql_listeners, store as request_metrics_store
+)
+from schema_migrations import ensure_indexes
+from routers import auth, roles
+
+# DB_MODE=async の場合は AsyncSession を使う非同期ルーターを使用
+if DB_MODE == "async":
+    from async_routers import users, corporations, shops, inquiries
+else:
+    from routers import users, corporations, shops, inquiries
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
+# 既存のテーブルに後から追加したインデックスを作成
+ensure_indexes(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared Casbin enforcers once at startup
+    registry.initialize()
+    # 他のワーカーによるポリシー変更を検知して反映する
+    if WATCH_ENABLED:
+        watcher.start()
+    yield
+    if WATCH_ENABLED:
+        watcher.stop()
+    if DB_MODE == "async":
+        from database import get_async_engine
+        await get_async_engine().dispose()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -14,7 +48,8 @@ app = FastAPI(
     description="PyCasbinを使用したRBACサンプルAPI",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,8 +59,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # ブラウザからキャッシュ検証（ETag）・次ページのカーソル・計測値を参照できるようにする
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing"],
 )
 
+# リクエスト単位のSQL・認可の計測（REQUEST_METRICS=true の場合のみ）
+if REQUEST_METRICS_ENABLED:
+    install_sql_listeners()
+    app.add_middleware(RequestMetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -52,9 +94,15 @@ async def health_check():
     """
     詳細なヘルスチェック情報を返します
     """
+    pools = {"sync": pool_metrics(engine)}
+    if DB_MODE == "async":
+        from database import get_async_engine
+        pools["async"] = pool_metrics(get_async_engine())
     return {
         "status": "healthy",
         "database": "connected",
+        "db_mode": DB_MODE,
+        "database_pool": pools,
         "api_version": "1.0.0",
         "endpoints": {
             "auth": "/auth",
@@ -64,4 +112,25 @@ async def health_check():
             "inquiries": "/inquiries",
             "roles": "/roles"
         }
-    }
\ No newline at end of file
+    }
+
+
+@app.get("/metrics/requests", tags=["health"], summary="リクエスト単位のSQL・認可の計測値",
+         dependencies=[Depends(security)])
+def request_metrics(current_user: bool = Depends(admin_authorization_manager)):
+    """
+    ルートごとのSQL件数・DB時間・最も遅いSQL・Casbinの判定時間の集計を返します
+    （REQUEST_METRICS=true で起動した場合のみ記録されます。所属法人で admin ロールが必要）
+    - **avg_casbin_ms**: 判定中のポリシー読み込みのSQL時間は含みません（avg_db_ms に含まれます）
+    """
+    return {"enabled": REQUEST_METRICS_ENABLED, "routes": request_metrics_store.snapshot()}
+
+
+@app.delete("/metrics/requests", tags=["health"], summary="リクエスト単位の計測値のリセット",
+            dependencies=[Depends(security)])
+def reset_request_metrics(current_user: bool = Depends(admin_authorization_manager)):
+    """
+    ルートごとの集計をリセットします（所属法人で admin ロールが必要）。
+    """
+    request_metrics_store.reset()
+    return {"message": "Request metrics reset"}
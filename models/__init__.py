@@ -9,6 +9,7 @@ from .corporations import Corporation
 from .shops import Shop
 from .inquiries import Inquiry
 from .roles import Role
+from .policy_revision import PolicyRevision
 
 __all__ = [
     "Base",
@@ -17,5 +18,6 @@ __all__ = [
     "Corporation",
     "Shop",
     "Inquiry",
-    "Role"
+    "Role",
+    "PolicyRevision"
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from . import Base
@@ -6,6 +6,12 @@ from . import Base
 
 class Inquiry(Base):
     __tablename__ = "inquiries"
+    __table_args__ = (
+        # 問い合わせ一覧（法人のみ）: corporation_id = ? ORDER BY id / id > :after
+        Index("ix_inquiries_corporation_id_id", "corporation_id", "id"),
+        # 問い合わせ一覧（ステータス・優先度での絞り込み）
+        Index("ix_inquiries_corporation_status_priority_id", "corporation_id", "status", "priority", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
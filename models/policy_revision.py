@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, DateTime
+from datetime import datetime
+from . import Base
+
+
+class PolicyRevision(Base):
+    """casbin_ruleのリビジョン（単一行。ポリシーを書き込むたびに同じトランザクションで+1する）"""
+    __tablename__ = "casbin_policy_revision"
+
+    id = Column(Integer, primary_key=True)
+    revision = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from . import Base
@@ -7,6 +7,10 @@ from .associations import corporation_shop
 
 class Shop(Base):
     __tablename__ = "shops"
+    __table_args__ = (
+        # 店舗一覧（corporation_id IN (...) ORDER BY id / id > :after）
+        Index("ix_shops_corporation_id_id", "corporation_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from . import Base
@@ -6,6 +6,10 @@ from . import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # 法人所属ユーザー一覧（corporation_id = ? ORDER BY id / id > :after）
+        Index("ix_users_corporation_id_id", "corporation_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
@@ -0,0 +1,72 @@
+"""
+キーセット（カーソル）ページネーション
+
+.offset(skip) は読み飛ばす行数に比例して遅くなるため、深いページでは
+「前のページの最後のID より大きい行」を主キー順に取得する（WHERE id > :after ORDER BY id）。
+- 主キー（id）は一意かつ単調増加のため、ページの境界で行が重複・欠落しない
+- corporation_id のインデックスは末尾に主キーを含むため、
+  corporation_id = ? AND id > ? も1回のインデックス範囲検索になる
+- カーソルはクライアントにとって不透明な文字列（最後のIDをbase64エンコード）
+
+一覧エンドポイントは skip / limit に加えて cursor を受け付け、次のページがある場合は
+X-Next-Cursor ヘッダーで次のカーソルを返す。
+"""
+import base64
+import json
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+# 次ページのカーソルを返すレスポンスヘッダー
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    """最後の行のIDから不透明なカーソル文字列を作成"""
+    payload = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """カーソル文字列から最後の行のIDを取得（不正な場合はValueError）"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(after, int):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return after
+
+
+def paginate(query, id_column, skip: int = 0, limit: int = 100, after: Optional[int] = None):
+    """
+    クエリに主キー順の並び替えとページ範囲を適用（Query / Select のどちらにも使用可能）
+
+    Args:
+        query: db.query(...) または select(...)
+        id_column: 並び替えに使う主キー列（例: models.Shop.id）
+        skip: 読み飛ばす行数（after を指定した場合は無視）
+        limit: 取得件数
+        after: 前のページの最後のID（キーセットページネーション）
+    """
+    query = query.order_by(id_column)
+    if after is not None:
+        return query.filter(id_column > after).limit(limit)
+    return query.offset(skip).limit(limit)
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[int]:
+    """リクエストのカーソルを検証してIDを取得（不正な場合は400）"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int) -> None:
+    """ページが埋まっている場合、最後の行から次のページのカーソルをヘッダーに設定"""
+    if rows and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
@@ -0,0 +1,199 @@
+"""
+コンパイル済みポリシーインデックス
+
+model.conf のドメインベースRBACは全ルールが完全一致（r.obj == p.obj && r.act == p.act）のため、
+ポリシーを domain → role → obj → set(act) のハッシュインデックスに変換し、
+g によるロールの継承関係もドメインごとに事前展開しておける。
+判定は汎用マッチャーの評価ではなく辞書の参照のみで行う。
+ロールテンプレート（dom = "*"）の権限は、判定時に各ドメインの権限と合成する。
+"""
+from typing import Dict, FrozenSet, Optional, Set
+
+import casbin
+
+from casbin_config import TEMPLATE_DOMAIN
+from decision_cache import CachedEnforcer
+
+# コンパイル可能なモデル定義（空白を除去して比較）
+COMPILABLE_REQUEST = ["r_sub", "r_dom", "r_obj", "r_act"]
+COMPILABLE_POLICY = ["p_sub", "p_dom", "p_obj", "p_act"]
+COMPILABLE_EFFECT = "some(where(p_eft==allow))"
+COMPILABLE_MATCHERS = {
+    "g(r_sub,p_sub,r_dom)&&r_dom==p_dom&&r_obj==p_obj&&r_act==p_act",
+    'g(r_sub,p_sub,r_dom)&&(p_dom=="*"||r_dom==p_dom)&&r_obj==p_obj&&r_act==p_act',
+}
+
+Permissions = Dict[str, FrozenSet[str]]
+
+
+def _normalize(expression: str) -> str:
+    return "".join(expression.split())
+
+
+def is_compilable(model) -> bool:
+    """モデルがインデックスにコンパイル可能な形（ドメインRBAC + 完全一致）かどうか"""
+    try:
+        if set(model["r"]) != {"r"} or set(model["p"]) != {"p"} or set(model["g"]) != {"g"}:
+            return False
+        if model["r"]["r"].tokens != COMPILABLE_REQUEST:
+            return False
+        if model["p"]["p"].tokens != COMPILABLE_POLICY:
+            return False
+        if len(model["g"]["g"].tokens) != 3:
+            return False
+        if _normalize(model["e"]["e"].value) != COMPILABLE_EFFECT:
+            return False
+        return _normalize(model["m"]["m"].value) in COMPILABLE_MATCHERS
+    except KeyError:
+        return False
+
+
+class CompiledPolicyIndex:
+    """
+    ドメインごとのポリシーインデックス
+
+    - permissions: domain → sub(ロール/ユーザー) → obj → set(act)
+                   （domain = "*" はロールテンプレート）
+    - roles:       domain → sub → 継承を含むロール集合（sub自身を含む）
+    """
+
+    def __init__(self, policies, grouping_policies, templates: bool = True):
+        # テンプレート対応のマッチャーでのみ "*" を全ドメイン共通として扱う
+        self.templates = templates
+        permissions: Dict[str, Dict[str, Dict[str, Set[str]]]] = {}
+        for rule in policies:
+            if len(rule) != 4:
+                continue
+            sub, dom, obj, act = rule
+            permissions.setdefault(dom, {}).setdefault(sub, {}).setdefault(obj, set()).add(act)
+
+        links: Dict[str, Dict[str, Set[str]]] = {}
+        for rule in grouping_policies:
+            if len(rule) != 3:
+                continue
+            user, role, dom = rule
+            links.setdefault(dom, {}).setdefault(user, set()).add(role)
+
+        self.permissions = {
+            dom: {
+                sub: {obj: frozenset(acts) for obj, acts in objs.items()}
+                for sub, objs in subs.items()
+            }
+            for dom, subs in permissions.items()
+        }
+        self.roles = {
+            dom: {sub: self._closure(sub, edges) for sub in edges}
+            for dom, edges in links.items()
+        }
+        self._effective: Dict[str, Dict[str, Permissions]] = {}
+        self._domains: Optional[Dict[str, FrozenSet[str]]] = None
+
+    @staticmethod
+    def _closure(sub: str, edges: Dict[str, Set[str]]) -> FrozenSet[str]:
+        """subから辿れるロールの集合（sub自身を含む）"""
+        seen = {sub}
+        stack = [sub]
+        while stack:
+            for role in edges.get(stack.pop(), ()):
+                if role not in seen:
+                    seen.add(role)
+                    stack.append(role)
+        return frozenset(seen)
+
+    @classmethod
+    def from_enforcer(cls, enforcer: casbin.Enforcer) -> Optional["CompiledPolicyIndex"]:
+        """エンフォーサーに読み込まれたポリシーからインデックスを構築（コンパイル不可ならNone）"""
+        model = enforcer.get_model()
+        if not is_compilable(model):
+            return None
+        templates = '"*"' in _normalize(model["m"]["m"].value)
+        return cls(enforcer.get_policy(), enforcer.get_grouping_policy(), templates=templates)
+
+    def roles_for(self, sub: str, dom: str) -> FrozenSet[str]:
+        """ドメイン内でsubが持つロール集合（継承を含む）"""
+        return self.roles.get(dom, {}).get(sub) or frozenset((sub,))
+
+    def domains_for(self, sub: str) -> FrozenSet[str]:
+        """subがロールの割り当て（g）または直接の権限（p）を持つドメイン（テンプレートを除く）"""
+        if self._domains is None:
+            domains: Dict[str, Set[str]] = {}
+            for source in (self.roles, self.permissions):
+                for dom, subs in source.items():
+                    if dom == TEMPLATE_DOMAIN:
+                        continue
+                    for name in subs:
+                        domains.setdefault(name, set()).add(dom)
+            self._domains = {name: frozenset(doms) for name, doms in domains.items()}
+        return self._domains.get(sub, frozenset())
+
+    def permissions_for(self, sub: str, dom: str) -> Permissions:
+        """ドメイン内でsubが持つ実効権限 obj → set(act)"""
+        effective = self._effective.get(dom, {}).get(sub)
+        if effective is not None:
+            return effective
+
+        sources = [self.permissions.get(dom, {})]
+        if self.templates and dom != TEMPLATE_DOMAIN:
+            sources.append(self.permissions.get(TEMPLATE_DOMAIN, {}))
+
+        merged: Dict[str, Set[str]] = {}
+        for role in self.roles_for(sub, dom):
+            for domain_permissions in sources:
+                for obj, acts in domain_permissions.get(role, {}).items():
+                    merged.setdefault(obj, set()).update(acts)
+        effective = {obj: frozenset(acts) for obj, acts in merged.items()}
+        self._effective.setdefault(dom, {})[sub] = effective
+        return effective
+
+    def enforce(self, sub: str, dom: str, obj: str, act: str) -> bool:
+        return act in self.permissions_for(sub, dom).get(obj, ())
+
+
+class CompiledEnforcer(CachedEnforcer):
+    """
+    コンパイル済みインデックスで判定するエンフォーサー
+
+    モデルがコンパイル可能な場合は CompiledPolicyIndex で判定し、
+    それ以外（または4要素以外のリクエスト）は判定キャッシュ付きの汎用マッチャーにフォールバックする。
+    インデックスはポリシー変更後の最初の判定時に再構築する。
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._index: Optional[CompiledPolicyIndex] = None
+        self._index_dirty = True
+        super().__init__(*args, **kwargs)
+
+    @property
+    def index(self) -> Optional[CompiledPolicyIndex]:
+        """現在のポリシーのインデックス（コンパイル不可のモデルではNone）"""
+        if self._index_dirty:
+            # 構築が終わるまで参照・フラグを変えない（同時に読んだ側に None・古いインデックスを返さない）
+            index = CompiledPolicyIndex.from_enforcer(self)
+            self._index = index
+            self._index_dirty = False
+            return index
+        return self._index
+
+    def clone(self) -> "CompiledEnforcer":
+        clone = super().clone()
+        clone._index = None
+        clone._index_dirty = True
+        return clone
+
+    def enforce(self, *rvals):
+        index = self.index if len(rvals) == 4 and self.enabled else None
+        if index is None:
+            return super().enforce(*rvals)
+        return index.enforce(*rvals)
+
+    def load_policy(self):
+        super().load_policy()
+        self._index_dirty = True
+
+    def clear_policy(self):
+        super().clear_policy()
+        self._index_dirty = True
+
+    def _invalidate_rules(self, rules) -> None:
+        self._index_dirty = True
+        super()._invalidate_rules(rules)
@@ -0,0 +1,256 @@
+"""
+ポリシーリビジョン（casbin_rule の変更カウンター）
+
+casbin_policy_revision テーブルの単一行に単調増加するリビジョンを保持し、casbin_rule を
+書き込むすべての経路（アダプター経由の save_policy / add_policy など、差分同期、
+セットアップスクリプト）で同じトランザクション内に +1 する。
+ワーカーは主キーでの1行読み込みだけでポリシーが変わったかどうかを判定でき、
+リビジョンが進んだ場合のみ全件の再読み込みを行う。
+
+アダプターは create_adapter() で作成する。アプリ共通のEngine（database.engine）を使い、
+テーブル・インデックスの作成（DDL）はプロセス内で初回のみ実行する。
+
+RevisionedAdapter はドメイン単位の読み込み（load_domain_policy）も提供する。
+p / g の2回の ORM クエリの代わりに、casbin_rule のインデックス
+（schema_migrations.CASBIN_RULE_INDEXES）で検索できる1回のクエリで読み込む。
+"""
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from casbin_sqlalchemy_adapter import Adapter
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from database import engine as default_engine
+from models import PolicyRevision
+
+# リビジョンを保持する行の主キー
+REVISION_ROW_ID = 1
+
+
+def ensure_policy_revision_table(engine=None) -> None:
+    """リビジョンテーブルと初期行（revision = 0）を作成（既に存在する場合は何もしない）"""
+    engine = engine or default_engine
+    PolicyRevision.__table__.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        exists = connection.execute(
+            select(PolicyRevision.id).where(PolicyRevision.id == REVISION_ROW_ID)
+        ).first()
+        if exists is not None:
+            return
+        try:
+            connection.execute(
+                PolicyRevision.__table__.insert().values(
+                    id=REVISION_ROW_ID, revision=0, updated_at=datetime.utcnow()
+                )
+            )
+            connection.commit()
+        except IntegrityError:
+            # 他のプロセスが同時に作成した
+            connection.rollback()
+
+
+def bump_policy_revision(session) -> int:
+    """
+    リビジョンを+1（呼び出し側のトランザクション内で実行し、コミットは呼び出し側で行う）
+
+    casbin_rule の変更と同じトランザクションで更新するため、リビジョンだけが進む・
+    ポリシーだけが変わるといった状態は他のワーカーから見えない。
+
+    Returns:
+        int: 更新後のリビジョン（同じトランザクション内で読み直した値）
+    """
+    updated = session.query(PolicyRevision).filter(
+        PolicyRevision.id == REVISION_ROW_ID
+    ).update(
+        {
+            PolicyRevision.revision: PolicyRevision.revision + 1,
+            PolicyRevision.updated_at: datetime.utcnow(),
+        },
+        synchronize_session=False
+    )
+    if not updated:
+        session.add(PolicyRevision(id=REVISION_ROW_ID, revision=1, updated_at=datetime.utcnow()))
+        return 1
+    return read_policy_revision(session)[0]
+
+
+def read_policy_revision(connection) -> Tuple[int, Optional[datetime]]:
+    """
+    現在のリビジョンと更新日時を主キーで1行読み込む
+
+    Args:
+        connection: Connection または Session
+
+    Returns:
+        (revision, updated_at)。行が存在しない場合は (0, None)
+    """
+    row = connection.execute(
+        select(PolicyRevision.revision, PolicyRevision.updated_at).where(
+            PolicyRevision.id == REVISION_ROW_ID
+        )
+    ).first()
+    if row is None:
+        return 0, None
+    return row.revision, row.updated_at
+
+
+_table_ready = False
+
+
+def get_policy_revision() -> int:
+    """現在のリビジョンを取得（初回はテーブルが存在しなければ作成する）"""
+    global _table_ready
+    if not _table_ready:
+        ensure_policy_revision_table()
+        _table_ready = True
+    with default_engine.connect() as connection:
+        return read_policy_revision(connection)[0]
+
+
+# casbin_rule・リビジョンテーブルのDDLを実行済みのEngine
+_schema_ready_engines: "weakref.WeakSet" = weakref.WeakSet()
+_schema_lock = threading.Lock()
+
+
+def create_adapter(engine=None, filtered: bool = False) -> "RevisionedAdapter":
+    """
+    共有のEngineを使うアダプターを作成
+
+    Adapter(URL) はURLごとに新しいEngine（コネクションプール）を作り、作成のたびに
+    casbin_rule の create_all を実行する。ここではアプリ共通のEngineを渡し、
+    DDL（テーブル・インデックス・リビジョン行の作成）はEngineごとに初回のみ実行する。
+
+    Args:
+        engine: 使用するEngine（省略時は database.engine）
+        filtered: Trueの場合、ドメイン単位の読み込み用（load_filtered_policy / load_domain_policy）
+    """
+    engine = engine or default_engine
+    with _schema_lock:
+        create_all_models = engine not in _schema_ready_engines
+        adapter = RevisionedAdapter(engine, filtered=filtered, create_all_models=create_all_models)
+        _schema_ready_engines.add(engine)
+    return adapter
+
+
+class RevisionedAdapter(Adapter):
+    """
+    書き込みのたびにポリシーリビジョンを+1するSQLAlchemy Adapter
+
+    書き込み系メソッドの実行中に開かれたセッションでは、コミット直前にリビジョンを更新する。
+    読み込み（load_policy / load_filtered_policy / load_domain_policy）ではリビジョンは変わらない。
+    """
+
+    def __init__(self, engine, *args, create_all_models: bool = True, **kwargs):
+        super().__init__(engine, *args, create_all_models=create_all_models, **kwargs)
+        self._writing = threading.local()
+        if create_all_models:
+            from schema_migrations import ensure_casbin_rule_indexes
+            ensure_casbin_rule_indexes(self._engine)
+            ensure_policy_revision_table(self._engine)
+
+    def load_domain_policy(self, model, domain: str, domain_fields: Dict[str, str]) -> None:
+        """
+        1つのドメインの p / g 行を1回のクエリで読み込む
+
+        Args:
+            model: 読み込み先のモデル
+            domain: ドメイン（例: "corporation_1"）
+            domain_fields: ptypeごとのドメインの列 例: {"p": "v1", "g": "v2"}
+
+        (ptype = 'p' AND v1 = :domain) OR (ptype = 'g' AND v2 = :domain) は
+        それぞれ (ptype, v1) / (ptype, v2, v0) のインデックスで検索される。
+        行は文字列に変換せず、列の値のままモデルに追加する。
+        """
+        rule = self._db_class
+        columns = [rule.v0, rule.v1, rule.v2, rule.v3, rule.v4, rule.v5]
+        query = select(rule.ptype, *columns).where(
+            or_(*(
+                and_(rule.ptype == ptype, getattr(rule, field) == domain)
+                for ptype, field in domain_fields.items()
+            ))
+        ).order_by(rule.id)
+
+        with self._engine.connect() as connection:
+            for ptype, *values in connection.execute(query):
+                assertion = model.model.get(ptype[:1], {}).get(ptype)
+                if assertion is None:
+                    continue
+                # CasbinRule.__str__ と同様に、最初の NULL 以降の列は使わない
+                if None in values:
+                    values = values[:values.index(None)]
+                assertion.policy.append(values)
+        self._filtered = True
+
+    @contextmanager
+    def _session_scope(self):
+        with super()._session_scope() as session:
+            yield session
+            if getattr(self._writing, "depth", 0):
+                revision = bump_policy_revision(session)
+                revisions = getattr(self._writing, "revisions", None)
+                if revisions is not None:
+                    revisions.append(revision)
+
+    @contextmanager
+    def recording_revisions(self):
+        """
+        このスレッドの書き込みで進めたリビジョンを記録する
+
+        with adapter.recording_revisions() as revisions: のブロック内の書き込みごとに、
+        更新後のリビジョンが revisions に追加される。
+        """
+        revisions: List[int] = []
+        self._writing.revisions = revisions
+        try:
+            yield revisions
+        finally:
+            self._writing.revisions = None
+
+    @contextmanager
+    def _write(self):
+        # 書き込みメソッドは入れ子で呼ばれることがあるため深さで管理する（スレッドごと）
+        self._writing.depth = getattr(self._writing, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._writing.depth -= 1
+
+    def save_policy(self, model):
+        with self._write():
+            return super().save_policy(model)
+
+    def add_policy(self, sec, ptype, rule):
+        with self._write():
+            return super().add_policy(sec, ptype, rule)
+
+    def add_policies(self, sec, ptype, rules):
+        with self._write():
+            return super().add_policies(sec, ptype, rules)
+
+    def remove_policy(self, sec, ptype, rule):
+        with self._write():
+            return super().remove_policy(sec, ptype, rule)
+
+    def remove_policies(self, sec, ptype, rules):
+        with self._write():
+            return super().remove_policies(sec, ptype, rules)
+
+    def remove_filtered_policy(self, sec, ptype, field_index, *field_values):
+        with self._write():
+            return super().remove_filtered_policy(sec, ptype, field_index, *field_values)
+
+    def update_policy(self, sec, ptype, old_rule, new_rule):
+        with self._write():
+            return super().update_policy(sec, ptype, old_rule, new_rule)
+
+    def update_policies(self, sec, ptype, old_rules, new_rules):
+        with self._write():
+            return super().update_policies(sec, ptype, old_rules, new_rules)
+
+    def update_filtered_policies(self, sec, ptype, new_rules, field_index, *field_values):
+        with self._write():
+            return super().update_filtered_policies(sec, ptype, new_rules, field_index, *field_values)
@@ -0,0 +1,180 @@
+"""
+ワーカー間のポリシー変更伝播（ローカルウォッチャー）
+
+uvicorn --workers N ではプロセスごとに共有エンフォーサーを持つため、あるワーカーで行った
+ロール変更は他のワーカーに反映されない。外部サービス（Redis等）を使わずに、各ワーカーが
+ポリシーリビジョン（policy_revision）を定期的にポーリングし、リビジョンが進んでいれば
+ポリシーを再読み込み（スナップショットの差し替え）する。
+
+- 1回のポーリングは casbin_policy_revision の主キーでの1行読み込みのみ
+- ポーリングはバックグラウンドスレッドで行うため、リクエスト数によらずコストは一定
+- casbin_rule の書き込みと同じトランザクションでリビジョンが更新されるため、
+  他テーブルへの書き込みでは再読み込みせず、UPDATE による変更も検知できる
+- 自ワーカーの差分書き込み（sync_user_roles_to_casbin → apply_grouping_delta）は変更したgルールのみを
+  メモリ上に適用し、進めたリビジョンも読み込み済みとして記録するため、ウォッチャーは再読み込みしない
+- 他ワーカーの変更はどのドメインが変わったかをリビジョンからは判別できないため、全体を再読み込みする
+  （ドメイン単位読み込みでは読み込み済みのドメインのみ。構築は書き込みロックの外で行う）
+- 他ワーカーの変更を再読み込みした際は、認証済みユーザーのキャッシュ（principal.principal_cache）も
+  全件破棄する（他ワーカーでのロール・法人の変更がTTLまで残らないようにする）
+反映までの遅延はポーリング間隔 + 再読み込み時間で抑えられる。
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from database import engine as default_engine
+from enforcer_registry import registry
+from policy_revision import read_policy_revision
+from principal import invalidate_all_principals
+
+# CASBIN_WATCH_POLICIES=0 でウォッチャーを無効化（単一ワーカーの場合など）
+WATCH_ENABLED = os.getenv("CASBIN_WATCH_POLICIES", "1") == "1"
+# ポーリング間隔（秒）
+DEFAULT_INTERVAL = float(os.getenv("CASBIN_WATCH_INTERVAL", 1.0))
+
+
+class PolicyWatcher:
+    """ポリシーリビジョンの変更を検知して再読み込みするポーリングスレッド"""
+
+    def __init__(
+        self,
+        reload_if_stale: Callable[[int], bool],
+        engine=None,
+        interval: float = DEFAULT_INTERVAL,
+        on_reload: Optional[Callable[[int], None]] = None
+    ):
+        """
+        Args:
+            reload_if_stale: 現在のリビジョンを受け取り、読み込み済みと異なれば再読み込みする関数
+            engine: ポーリングに使うエンジン
+            interval: ポーリング間隔（秒）
+            on_reload: 再読み込みした後に現在のリビジョンを受け取って呼ばれる関数（キャッシュの破棄など）
+        """
+        self.reload_if_stale = reload_if_stale
+        self.on_reload = on_reload
+        self.engine = engine or default_engine
+        self.interval = interval
+
+        self._connection = None
+        self.revision: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # メトリクス
+        self.polls = 0
+        self.changes = 0
+        self.local_changes = 0
+        self.errors = 0
+        self.reloads = 0
+        self.last_poll_at: Optional[float] = None
+        self.last_change_at: Optional[float] = None
+        self.last_reload_seconds: Optional[float] = None
+        self.last_propagation_seconds: Optional[float] = None
+        self.max_propagation_seconds = 0.0
+
+    def start(self) -> None:
+        """ポーリングを開始"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="casbin-policy-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """ポーリングを停止"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def poll_once(self) -> bool:
+        """
+        一度だけリビジョンを確認し、読み込み済みのリビジョンから進んでいれば再読み込みする
+
+        Returns:
+            bool: 再読み込みした場合True
+        """
+        self.polls += 1
+        self.last_poll_at = time.time()
+
+        revision, updated_at = self._read_revision()
+        changed = self.revision is not None and revision != self.revision
+        if revision != self.revision:
+            if changed:
+                self.changes += 1
+                self.last_change_at = self.last_poll_at
+            self.revision = revision
+
+        start = time.perf_counter()
+        if not self.reload_if_stale(revision):
+            if changed:
+                # 自ワーカーの差分書き込みで適用済みの変更
+                self.local_changes += 1
+            return False
+        self.reloads += 1
+        self.last_reload_seconds = time.perf_counter() - start
+        if self.on_reload is not None:
+            self.on_reload(revision)
+
+        # リビジョンが更新された（ポリシーがコミットされた）時刻から反映完了までの時間
+        if updated_at is not None:
+            self.last_propagation_seconds = (datetime.utcnow() - updated_at).total_seconds()
+            self.max_propagation_seconds = max(self.max_propagation_seconds, self.last_propagation_seconds)
+        return True
+
+    def stats(self) -> dict:
+        """ポーリング回数・検知回数・反映遅延などの統計情報"""
+        return {
+            "running": self._thread is not None,
+            "interval": self.interval,
+            "revision": self.revision,
+            "polls": self.polls,
+            "changes": self.changes,
+            "local_changes": self.local_changes,
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "last_poll_at": self.last_poll_at,
+            "last_change_at": self.last_change_at,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_propagation_seconds": self.last_propagation_seconds,
+            "max_propagation_seconds": self.max_propagation_seconds,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"Policy watcher error: {e}")
+                # 接続が切れた可能性があるため次回に作り直す
+                if self._connection is not None:
+                    self._connection.close()
+                    self._connection = None
+
+    def _read_revision(self):
+        """現在のリビジョンを主キーで1行読み込む（接続はポーリング間で使い回す）"""
+        if self._connection is None:
+            self._connection = self.engine.connect()
+        try:
+            return read_policy_revision(self._connection)
+        finally:
+            # 次回のポーリングで最新の状態を読めるようトランザクションを終える
+            self._connection.rollback()
+
+
+# プロセス共通のウォッチャー（main.py の lifespan で開始・停止する）
+watcher = PolicyWatcher(
+    lambda revision: registry.reload_if_stale(revision),
+    on_reload=lambda revision: invalidate_all_principals()
+)
+
+
+def get_watcher_stats() -> dict:
+    """ウォッチャーの統計情報（反映遅延など）を取得"""
+    return watcher.stats()
@@ -0,0 +1,228 @@
+"""
+リクエスト単位の認証済み主体（Principal）
+
+認証時に一度だけ構築し、ルーター・authorization_manager・CRUDのテナントフィルターで共有する。
+- user:    ロール・法人をeager loadして取得したユーザーの不変スナップショット
+- domain:  Casbinのドメイン（corporation_{id}）
+- roles:   ドメイン内で解決済みのロール集合（継承を含む）
+
+トークン → ユーザーの参照結果は、セッションから切り離した不変のスナップショットとして
+TTL付きでキャッシュする（PrincipalCache）。ロール集合はポリシー変更に追従するため
+キャッシュせず、リクエストごとに共有エンフォーサーから解決する。
+
+キャッシュの無効化:
+- 自ワーカーでのユーザー更新・ロール変更は invalidate_user_principal() でユーザー単位に破棄する
+- 他ワーカーでのロール・法人の変更は casbin_rule の書き込み（ポリシーリビジョンの更新）を伴うため、
+  ポリシーウォッチャーが再読み込みした際に全エントリを破棄する（policy_watcher.watcher）
+- 読み込み中に無効化された場合に古いスナップショットを登録し直さないよう、読み込み開始時の
+  世代（generation）を set() に渡し、無効化で世代が進んでいれば登録しない
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+import models
+from enforcer_registry import get_roles_for_user
+
+# キャッシュの既定値（環境変数で変更可能）
+PRINCIPAL_CACHE_MAXSIZE = int(os.getenv("PRINCIPAL_CACHE_MAXSIZE", 10000))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 60))  # 秒
+
+
+def domain_for(corporation_id: Optional[int]) -> Optional[str]:
+    """法人IDからCasbinのドメイン名を生成"""
+    if corporation_id is None:
+        return None
+    return f"corporation_{corporation_id}"
+
+
+def corporation_id_for(domain: str) -> Optional[int]:
+    """Casbinのドメイン名から法人IDを取得（corporation_{id} 以外の形式はNone）"""
+    prefix, _, value = domain.partition("_")
+    if prefix != "corporation" or not value.isdigit():
+        return None
+    return int(value)
+
+
+@dataclass(frozen=True)
+class RoleSnapshot:
+    """ロールの不変スナップショット"""
+    id: int
+    name: str
+    description: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    ユーザーの不変スナップショット
+
+    models.User と同じ属性名を持つため、レスポンスモデル（from_attributes）や
+    current_user.role.name などの既存の参照はそのまま使える。
+    """
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    corporation_id: Optional[int]
+    role_id: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    role: Optional[RoleSnapshot] = None
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "UserSnapshot":
+        role = None
+        if user.role is not None:
+            role = RoleSnapshot(id=user.role.id, name=user.role.name, description=user.role.description)
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            corporation_id=user.corporation_id,
+            role_id=user.role_id,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            role=role
+        )
+
+
+class PrincipalCache:
+    """
+    トークン → UserSnapshot のLRU/TTLキャッシュ（ユーザーID単位・全体で無効化可能）
+
+    無効化のたびに世代（generation）を進める。読み込み側は読み込み開始前に generation を取得して
+    set() に渡し、その間に無効化があった場合は登録を破棄する（無効化後の古い値の再登録を防ぐ）。
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_MAXSIZE, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._entries: "OrderedDict[str, Tuple[UserSnapshot, float]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        """キャッシュ済みのスナップショットを取得（未登録・期限切れの場合はNone）"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self._discard(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, token: str, snapshot: UserSnapshot, generation: Optional[int] = None) -> None:
+        """
+        スナップショットを登録
+
+        Args:
+            generation: 読み込み開始前に取得した generation。以降に無効化があった場合は登録しない
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._discard(token)
+            self._entries[token] = (snapshot, time.monotonic() + self.ttl)
+            self._by_user.setdefault(snapshot.id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """ユーザーに紐づく全トークンのエントリを無効化"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            for token in list(self._by_user.get(user_id, ())):
+                self._discard(token)
+
+    def clear(self) -> None:
+        """全エントリを無効化"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+            self._by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """ヒット・ミス数などの統計情報"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations,
+                "generation": self.generation,
+            }
+
+    def _discard(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._by_user.get(entry[0].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[entry[0].id]
+
+
+# プロセス共通のキャッシュ
+principal_cache = PrincipalCache()
+
+
+def invalidate_user_principal(user_id: int) -> None:
+    """ユーザー情報・ロールの変更時にキャッシュ済みのスナップショットを破棄"""
+    principal_cache.invalidate_user(user_id)
+
+
+def invalidate_all_principals() -> None:
+    """他ワーカーのポリシー変更を反映した際に、キャッシュ済みのスナップショットをすべて破棄"""
+    principal_cache.clear()
+
+
+class Principal:
+    """認証済みユーザーとその認可情報"""
+
+    def __init__(self, user: UserSnapshot, roles: FrozenSet[str] = frozenset()):
+        self.user = user
+        self.id = user.id
+        self.username = user.username
+        self.corporation_id = user.corporation_id
+        self.domain = domain_for(user.corporation_id)
+        self.roles = roles
+
+    @classmethod
+    def from_user(cls, user: UserSnapshot) -> "Principal":
+        """ユーザーからPrincipalを構築（ロールは共有エンフォーサーから解決）"""
+        domain = domain_for(user.corporation_id)
+        roles = get_roles_for_user(user.username, domain) if domain else frozenset()
+        return cls(user, roles)
+
+    def has_role(self, role: str) -> bool:
+        return role in self.roles
+
+    def __repr__(self) -> str:
+        return f"Principal(username={self.username!r}, domain={self.domain!r}, roles={sorted(self.roles)!r})"
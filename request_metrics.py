@@ -0,0 +1,223 @@
+"""
+リクエスト単位のSQL・認可の計測
+
+1リクエストの間に get_current_user・認可（Casbin）・crud が発行したSQLの件数と合計時間、
+最も遅いSQL、Casbinの判定時間を記録し、
+- レスポンスヘッダー（Server-Timing）
+- プロセス内の集計（GET /metrics/requests、DELETE でリセット。いずれも認可が必要）
+で確認できるようにする。
+
+REQUEST_METRICS=true の場合のみ有効になる。無効の場合はミドルウェア・SQLAlchemyの
+イベントリスナーを登録せず、認可関数もラップしないため、計測のための処理は実行されない。
+    REQUEST_METRICS=true uvicorn main:app
+"""
+import functools
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS", "false").lower() in ("1", "true", "yes")
+
+# 集計に残すSQLの最大長
+MAX_STATEMENT_LENGTH = 300
+
+
+class RequestMetrics:
+    """1リクエスト分の計測値"""
+
+    __slots__ = (
+        "start", "statements", "db_time", "slowest_time", "slowest_statement",
+        "enforce_time", "enforce_calls", "_enforce_depth",
+    )
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.enforce_time = 0.0
+        self.enforce_calls = 0
+        self._enforce_depth = 0
+
+    def add_statement(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.db_time += elapsed
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        """Server-Timing ヘッダーの値（ミリ秒）"""
+        total = time.perf_counter() - self.start
+        return ", ".join([
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} queries"',
+            f"db-slowest;dur={self.slowest_time * 1000:.2f}",
+            f'casbin;dur={self.enforce_time * 1000:.2f};desc="{self.enforce_calls} checks"',
+            f"total;dur={total * 1000:.2f}",
+        ])
+
+
+# 処理中のリクエストの計測値（同期エンドポイント・依存関係はスレッドプールで実行されるが、
+# ContextVar はコピーされて引き継がれるため、同じ RequestMetrics に記録される）
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """処理中のリクエストの計測値（計測していない場合は None）"""
+    return _current.get()
+
+
+def timed_authorization(func):
+    """
+    認可関数の実行時間をCasbinの判定時間として記録するデコレーター
+
+    入れ子の呼び出し（get_effective_permissions → batch_authorize など）は外側のみを数える。
+    ドメイン単位読み込み（filteredモード）で判定中に発生したポリシーの読み込み（ensure_domain）の
+    SQLはDB時間として記録されるため、Casbinの判定時間からは差し引く（二重に数えない）。
+    計測が無効の場合は関数をそのまま返す（呼び出しごとのオーバーヘッドなし）。
+    """
+    if not REQUEST_METRICS_ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        metrics = _current.get()
+        if metrics is None or metrics._enforce_depth:
+            return func(*args, **kwargs)
+        metrics._enforce_depth += 1
+        start = time.perf_counter()
+        db_time = metrics.db_time
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.enforce_time += time.perf_counter() - start - (metrics.db_time - db_time)
+            metrics.enforce_calls += 1
+            metrics._enforce_depth -= 1
+
+    return wrapper
+
+
+class RequestMetricsStore:
+    """ルートごとの集計（プロセス内）"""
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, metrics: RequestMetrics, duration: float) -> None:
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    "requests": 0, "statements": 0, "max_statements": 0,
+                    "db_ms": 0.0, "max_db_ms": 0.0, "casbin_ms": 0.0, "duration_ms": 0.0,
+                    "slowest_statement_ms": 0.0, "slowest_statement": None,
+                }
+            stats["requests"] += 1
+            stats["statements"] += metrics.statements
+            stats["max_statements"] = max(stats["max_statements"], metrics.statements)
+            stats["db_ms"] += metrics.db_time * 1000
+            stats["max_db_ms"] = max(stats["max_db_ms"], metrics.db_time * 1000)
+            stats["casbin_ms"] += metrics.enforce_time * 1000
+            stats["duration_ms"] += duration * 1000
+            if metrics.slowest_statement and metrics.slowest_time * 1000 >= stats["slowest_statement_ms"]:
+                stats["slowest_statement_ms"] = metrics.slowest_time * 1000
+                stats["slowest_statement"] = " ".join(metrics.slowest_statement.split())[:MAX_STATEMENT_LENGTH]
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """ルートごとの件数・合計・平均"""
+        with self._lock:
+            result = {}
+            for route, stats in self._routes.items():
+                requests = stats["requests"]
+                result[route] = {
+                    "requests": requests,
+                    "avg_statements": round(stats["statements"] / requests, 2),
+                    "max_statements": stats["max_statements"],
+                    "avg_db_ms": round(stats["db_ms"] / requests, 3),
+                    "max_db_ms": round(stats["max_db_ms"], 3),
+                    "avg_casbin_ms": round(stats["casbin_ms"] / requests, 3),
+                    "avg_duration_ms": round(stats["duration_ms"] / requests, 3),
+                    "slowest_statement_ms": round(stats["slowest_statement_ms"], 3),
+                    "slowest_statement": stats["slowest_statement"],
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+store = RequestMetricsStore()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("request_metrics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    if metrics is None:
+        return
+    starts = conn.info.get("request_metrics_start")
+    if starts:
+        metrics.add_statement(statement, time.perf_counter() - starts.pop())
+
+
+_listeners_installed = False
+
+
+def install_sql_listeners() -> None:
+    """全Engine（ORM・Casbinアダプター・AsyncEngine）のSQL実行を計測するリスナーを登録"""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _listeners_installed = True
+
+
+def _route_name(scope) -> str:
+    # パスではなくルートのテンプレート（/corporations/{corporation_id}/users）で集計する
+    # （どのルートにも一致しないリクエストはまとめ、集計のキーが際限なく増えないようにする）
+    path = getattr(scope.get("route"), "path", None) or "(unmatched)"
+    return f"{scope.get('method', '')} {path}"
+
+
+class RequestMetricsMiddleware:
+    """
+    リクエストごとに計測値を作成し、Server-Timing ヘッダーの付与と集計を行うASGIミドルウェア
+
+    ヘッダーはレスポンスの開始時点（エンドポイントの処理が終わった後）の値で付与する。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", metrics.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            store.record(_route_name(scope), metrics, time.perf_counter() - metrics.start)
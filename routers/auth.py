@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Body
+import hashlib
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Body, Request, Response
 from sqlalchemy.orm import Session
 import crud
 import schemas
 from database import get_db
+from auth import security, get_current_principal
 from auth_examples import login_examples
+from authorization_manager import get_effective_permissions
+from enforcer_registry import get_enforcer
+from principal import Principal
 
 router = APIRouter(
     prefix="/auth",
@@ -11,6 +18,22 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# If-None-Match のエンティティタグ（"..." または W/"..."）
+ENTITY_TAG = re.compile(r'(?:W/)?"[^"]*"')
+
+
+def _if_none_match(header: str, etag: str) -> bool:
+    """If-None-Match が etag に一致するか（* ・カンマ区切りのリストに対応し、弱い比較で完全一致）"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in ENTITY_TAG.findall(header):
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
 
 @router.post("/login", response_model=schemas.Token, summary="ユーザーログイン")
 def login(
@@ -69,4 +92,39 @@ def get_simple_token(
         "user_id": user.id,
         "username": user.username,
         "corporation_id": user.corporation_id
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/me/permissions", response_model=schemas.PermissionMatrix, summary="ログインユーザーの実効権限取得", dependencies=[Depends(security)])
+def read_my_permissions(
+    request: Request,
+    response: Response,
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    ログインユーザーの所属法人ドメインでの実効権限（resource → actions）を一度に取得します。
+    ロールの継承（admin → accountant など）を含みます。
+
+    レスポンスにはポリシーリビジョンを含むETagを付与します。
+    If-None-Match が一致する場合は実効権限を計算せずに 304 Not Modified を返します。
+    """
+    # ETagは内容を計算する前に、読み込み済みのポリシー（リビジョン・メモリ上の変更回数）と
+    # Principal（ユーザー・ドメイン・ロール）から求める
+    enforcer = get_enforcer()
+    revision, version = enforcer.revision, enforcer.version
+    subject = "\n".join([principal.username, principal.domain or "", *sorted(principal.roles)])
+    digest = hashlib.sha1(subject.encode()).hexdigest()[:16]
+    etag = f'W/"{revision}-{version}-{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _if_none_match(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    permissions = get_effective_permissions(principal)
+    response.headers.update(headers)
+    return {
+        "username": principal.username,
+        "domain": principal.domain,
+        "roles": sorted(principal.roles),
+        "permissions": {resource: sorted(actions) for resource, actions in sorted(permissions.items())},
+        "policy_revision": revision,
+    }
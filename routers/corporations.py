@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 import crud
 import schemas
 import models
 from database import get_db
-from auth import security, get_current_user
+from auth import security, get_current_principal
+from principal import Principal
 from authorization_manager import authorization_manager
+from pagination import parse_cursor, set_next_cursor
 
 router = APIRouter(
     prefix="/corporations",
@@ -35,16 +37,19 @@ router = APIRouter(
 
 @router.get("/", response_model=List[schemas.Corporation], summary="法人一覧取得", dependencies=[Depends(security)])
 def read_corporations(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
     法人一覧を取得します。
     """
-    corporations = crud.get_corporations(db, skip=skip, limit=limit)
+    corporations = crud.get_corporations(db, skip=skip, limit=limit, after=parse_cursor(cursor))
+    set_next_cursor(response, corporations, limit)
     return corporations
 
 
@@ -52,7 +57,7 @@ def read_corporations(
 def read_corporation(
     corporation_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
@@ -81,7 +86,7 @@ def read_corporation(
 def delete_corporation(
     corporation_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
@@ -96,10 +101,12 @@ def delete_corporation(
 @router.get("/{corporation_id}/users", response_model=List[schemas.User], summary="法人所属ユーザー一覧", dependencies=[Depends(security)])
 def read_corporation_users(
     corporation_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
@@ -109,17 +116,20 @@ def read_corporation_users(
     db_corporation = crud.get_corporation(db, corporation_id=corporation_id)
     if db_corporation is None:
         raise HTTPException(status_code=404, detail="Corporation not found")
-    users = crud.get_users_by_corporation(db, corporation_id=corporation_id, skip=skip, limit=limit)
+    users = crud.get_users_by_corporation(db, corporation_id=corporation_id, skip=skip, limit=limit, after=parse_cursor(cursor))
+    set_next_cursor(response, users, limit)
     return users
 
 
 @router.get("/{corporation_id}/shops", response_model=List[schemas.Shop], summary="法人関連店舗一覧", dependencies=[Depends(security)])
 def read_corporation_shops(
     corporation_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
@@ -129,7 +139,8 @@ def read_corporation_shops(
     db_corporation = crud.get_corporation(db, corporation_id=corporation_id)
     if db_corporation is None:
         raise HTTPException(status_code=404, detail="Corporation not found")
-    shops = crud.get_shops_by_corporation(db, corporation_id=corporation_id, skip=skip, limit=limit)
+    shops = crud.get_shops_by_corporation(db, corporation_id=corporation_id, skip=skip, limit=limit, after=parse_cursor(cursor))
+    set_next_cursor(response, shops, limit)
     return shops
 
 
@@ -139,7 +150,7 @@ def read_corporation_shops(
 #     skip: int = 0,
 #     limit: int = 100,
 #     db: Session = Depends(get_db),
-#     current_user: models.User = Depends(get_current_user),  # 認証
+#     principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 # ):
 #     """
@@ -158,7 +169,7 @@ def add_shop_to_corporation(
     corporation_id: int,
     shop_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
@@ -175,7 +186,7 @@ def remove_shop_from_corporation(
     corporation_id: int,
     shop_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
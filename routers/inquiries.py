@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -6,8 +6,11 @@ import crud
 import schemas
 import models
 from database import get_db
-from auth import security, get_current_user
+from auth import security, get_current_principal
+from principal import Principal
+from policy_query import authorization_filter
 from authorization_manager import authorization_manager
+from pagination import parse_cursor, set_next_cursor
 
 router = APIRouter(
     prefix="/inquiries",
@@ -50,13 +53,15 @@ router = APIRouter(
 
 @router.get("/", response_model=List[schemas.Inquiry], summary="問い合わせ一覧取得（管理者のみ）", dependencies=[Depends(security)])
 def read_inquiries(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     priority: Optional[str] = None,
     db: Session = Depends(get_db),
     is_authorized: bool = Depends(authorization_manager),
-    current_user: models.User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ):
     """
     問い合わせ一覧を取得します。（管理者のみアクセス可能）
@@ -71,15 +76,17 @@ def read_inquiries(
     if not is_authorized:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # マルチテナント対応：ユーザーの所属法人のデータのみを取得
+    # マルチテナント対応：Casbinポリシーから求めた認可済みの法人のデータのみを取得
     inquiries = crud.get_inquiries(
         db,
         skip=skip,
         limit=limit,
         status=status,
         priority=priority,
-        corporation_id=current_user.corporation_id
+        authorized=authorization_filter(principal, "inquiries", "read", models.Inquiry.corporation_id),
+        after=parse_cursor(cursor)
     )
+    set_next_cursor(response, inquiries, limit)
     return inquiries
 
 
@@ -88,7 +95,7 @@ def read_inquiry(
     inquiry_id: int,
     db: Session = Depends(get_db),
     is_authorized: bool = Depends(authorization_manager),
-    current_user: models.User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal)
 ):
     """
     指定IDの問い合わせ詳細を取得します（関連情報含む）。
@@ -101,11 +108,11 @@ def read_inquiry(
     if not is_authorized:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # マルチテナント対応：ユーザーの所属法人のデータのみを取得
+    # マルチテナント対応：inquiries:read 権限を持つ法人のデータのみを取得
     db_inquiry = crud.get_inquiry(
         db,
         inquiry_id=inquiry_id,
-        corporation_id=current_user.corporation_id
+        authorized=authorization_filter(principal, "inquiries", "read", models.Inquiry.corporation_id)
     )
     if db_inquiry is None:
         raise HTTPException(status_code=404, detail="Inquiry not found")
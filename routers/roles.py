@@ -7,7 +7,7 @@ import schemas
 import models
 from database import get_db
 from auth import security
-from authorization_manager import authorization_manager
+from authorization_manager import admin_authorization_manager, authorization_manager
 
 router = APIRouter(
     prefix="/roles",
@@ -31,7 +31,8 @@ def read_roles(
     return roles
 
 
-@router.get("/{role_id}", response_model=schemas.Role, summary="ロール詳細取得", dependencies=[Depends(security)])
+# role_id は整数のみ一致させる（/casbin-cache などの管理用パスがこのルートに一致しないように）
+@router.get("/{role_id:int}", response_model=schemas.Role, summary="ロール詳細取得", dependencies=[Depends(security)])
 def read_role(
     role_id: int,
     db: Session = Depends(get_db),
@@ -221,6 +222,26 @@ def sync_casbin_policies(
         raise HTTPException(status_code=500, detail="Failed to synchronize Casbin policies")
 
 
+@router.post("/reload-casbin", summary="Casbinポリシー再読み込み", dependencies=[Depends(security)])
+def reload_casbin_policies(
+    background: bool = False,
+    current_user: models.User = Depends(admin_authorization_manager)
+):
+    """
+    共有エンフォーサーのポリシーをデータベースから再読み込みします（所属法人で admin ロールが必要）。
+    casbin_ruleテーブルを直接更新した場合などに使用します。
+    - **background**: trueの場合は再読み込みの完了を待たずに応答します
+
+    再読み込み中の認可判定は直前のポリシーで継続されます。
+    """
+    from enforcer_registry import reload_policies
+
+    reload_policies(wait=not background)
+    if background:
+        return {"message": "Casbin policy reload started"}
+    return {"message": "Casbin policies reloaded successfully"}
+
+
 @router.get("/casbin-policies", summary="Casbinポリシー一覧取得", dependencies=[Depends(security)])
 def read_casbin_policies(
     db: Session = Depends(get_db),
@@ -230,9 +251,10 @@ def read_casbin_policies(
     現在のCasbinポリシーを取得します。
     管理者のみアクセス可能。
     """
-    from casbin_rbac_auth import get_enforcer
+    from enforcer_registry import get_enforcer
 
-    enforcer = get_enforcer()
+    # 同一スナップショットから取得する（途中でポリシーが差し替わっても整合するように）
+    enforcer = get_enforcer().snapshot
     policies = enforcer.get_policy()
     groupings = enforcer.get_grouping_policy()
 
@@ -241,4 +263,36 @@ def read_casbin_policies(
         "groupings": groupings,
         "total_policies": len(policies),
         "total_groupings": len(groupings)
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/casbin-cache", summary="Casbin判定キャッシュ統計取得", dependencies=[Depends(security)])
+def read_casbin_cache_stats(
+    current_user: models.User = Depends(admin_authorization_manager)
+):
+    """
+    共有エンフォーサーの判定キャッシュのヒット・ミス数を取得します（所属法人で admin ロールが必要）。
+    - **mode**: 判定モード（CASBIN_ENFORCER_MODE）
+    - **active**: 判定キャッシュが使われているか。compiled / filtered モードでは判定を
+      コンパイル済みインデックスで行うため判定キャッシュは参照されず、false になります（cached モードのみ true）
+    """
+    from enforcer_registry import get_decision_cache_stats
+
+    return get_decision_cache_stats()
+
+
+@router.get("/casbin-watcher", summary="Casbinポリシー変更ウォッチャーの状態取得", dependencies=[Depends(security)])
+def read_casbin_watcher_stats(
+    current_user: models.User = Depends(admin_authorization_manager)
+):
+    """
+    ワーカー間のポリシー変更伝播の状態を取得します（所属法人で admin ロールが必要）。
+    - **changes**: 検知したリビジョンの変更回数
+    - **local_changes**: そのうち自ワーカーの差分書き込みで適用済みのため再読み込みしなかった回数
+    - **reloads**: 他ワーカーの変更による再読み込み回数（全体の再読み込み）
+    - **last_propagation_seconds**: 直近の変更が反映されるまでの時間（上限値）
+    - **max_propagation_seconds**: 反映までの時間の最大値
+    """
+    from policy_watcher import get_watcher_stats
+
+    return get_watcher_stats()
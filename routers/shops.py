@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 import crud
 import schemas
 import models
 from database import get_db
-from auth import security, get_current_user
+from auth import security, get_current_principal
+from principal import Principal
+from policy_query import authorization_filter
 from authorization_manager import authorization_manager
+from pagination import parse_cursor, set_next_cursor
 
 router = APIRouter(
     prefix="/shops",
@@ -20,7 +23,7 @@ router = APIRouter(
 def create_shop(
     shop: schemas.ShopCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
@@ -33,10 +36,10 @@ def create_shop(
     """
 
     # マルチテナント: 自分の法人の店舗のみ作成可能
-    if shop.corporation_id != current_user.corporation_id:
+    if shop.corporation_id != principal.corporation_id:
         raise HTTPException(
             status_code=403,
-            detail=f"You can only create shops for your corporation (ID: {current_user.corporation_id})"
+            detail=f"You can only create shops for your corporation (ID: {principal.corporation_id})"
         )
 
     return crud.create_shop(db=db, shop=shop)
@@ -44,18 +47,27 @@ def create_shop(
 
 @router.get("/", response_model=List[schemas.Shop], summary="店舗一覧取得", dependencies=[Depends(security)])
 def read_shops(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
-    店舗一覧を取得します（自法人のみ）。
+    店舗一覧を取得します（shops:read 権限を持つ法人のみ）。
     """
 
-    # マルチテナント対応：自法人の店舗のみ取得
-    shops = crud.get_shops(db, skip=skip, limit=limit, corporation_id=current_user.corporation_id)
+    # マルチテナント対応：Casbinポリシーから求めた認可済みの法人の店舗のみ取得
+    shops = crud.get_shops(
+        db,
+        skip=skip,
+        limit=limit,
+        authorized=authorization_filter(principal, "shops", "read", models.Shop.corporation_id),
+        after=parse_cursor(cursor)
+    )
+    set_next_cursor(response, shops, limit)
     return shops
 
 
@@ -63,15 +75,19 @@ def read_shops(
 def read_shop(
     shop_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
     指定IDの店舗詳細を取得します。
 
-    マルチテナント対応：自法人の店舗のみ取得可能
+    マルチテナント対応：shops:read 権限を持つ法人の店舗のみ取得可能
     """
-    db_shop = crud.get_shop(db, shop_id=shop_id, corporation_id=current_user.corporation_id)
+    db_shop = crud.get_shop(
+        db,
+        shop_id=shop_id,
+        authorized=authorization_filter(principal, "shops", "read", models.Shop.corporation_id)
+    )
     if db_shop is None:
         raise HTTPException(status_code=404, detail="Shop not found")
     return db_shop
@@ -82,7 +98,7 @@ def update_shop(
     shop_id: int,
     shop: schemas.ShopUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
@@ -90,13 +106,18 @@ def update_shop(
     """
 
     # 更新時に法人 IDを変更しようとした場合はエラー
-    if shop.corporation_id and shop.corporation_id != current_user.corporation_id:
+    if shop.corporation_id and shop.corporation_id != principal.corporation_id:
         raise HTTPException(
             status_code=403,
             detail="Cannot change shop to different corporation"
         )
 
-    db_shop = crud.update_shop(db, shop_id=shop_id, shop=shop, corporation_id=current_user.corporation_id)
+    db_shop = crud.update_shop(
+        db,
+        shop_id=shop_id,
+        shop=shop,
+        authorized=authorization_filter(principal, "shops", "update", models.Shop.corporation_id)
+    )
     if db_shop is None:
         raise HTTPException(status_code=404, detail="Shop not found")
     return db_shop
@@ -106,14 +127,18 @@ def update_shop(
 def delete_shop(
     shop_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
     指定IDの店舗を削除します。
     """
 
-    success = crud.delete_shop(db, shop_id=shop_id, corporation_id=current_user.corporation_id)
+    success = crud.delete_shop(
+        db,
+        shop_id=shop_id,
+        authorized=authorization_filter(principal, "shops", "delete", models.Shop.corporation_id)
+    )
     if not success:
         raise HTTPException(status_code=404, detail="Shop not found")
     return {"message": "Shop deleted successfully"}
@@ -122,10 +147,12 @@ def delete_shop(
 @router.get("/corporation/{corporation_id}/shops", response_model=List[schemas.Shop], summary="法人の店舗一覧", dependencies=[Depends(security)])
 def read_corporation_shops(
     corporation_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),  # 認証
+    principal: Principal = Depends(get_current_principal),  # 認証
     authorized: bool = Depends(authorization_manager)  # 認可
 ):
     """
@@ -135,15 +162,16 @@ def read_corporation_shops(
     """
 
     # マルチテナントチェック
-    if corporation_id != current_user.corporation_id:
+    if corporation_id != principal.corporation_id:
         raise HTTPException(
             status_code=403,
-            detail=f"You can only access shops for your corporation (ID: {current_user.corporation_id})"
+            detail=f"You can only access shops for your corporation (ID: {principal.corporation_id})"
         )
 
     db_corporation = crud.get_corporation(db, corporation_id=corporation_id)
     if db_corporation is None:
         raise HTTPException(status_code=404, detail="Corporation not found")
 
-    shops = crud.get_shops_by_corporation(db, corporation_id=corporation_id, skip=skip, limit=limit)
+    shops = crud.get_shops_by_corporation(db, corporation_id=corporation_id, skip=skip, limit=limit, after=parse_cursor(cursor))
+    set_next_cursor(response, shops, limit)
     return shops
\ No newline at end of file
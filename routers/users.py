@@ -6,7 +6,8 @@ import crud
 import schemas
 import models
 from database import get_db
-from auth import security, get_current_user
+from auth import security, get_current_principal
+from principal import Principal
 
 router = APIRouter(
     prefix="/users",
@@ -34,11 +35,11 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=schemas.User, summary="現在のユーザー情報取得")
-def read_current_user(current_user: models.User = Depends(get_current_user)):
+def read_current_user(principal: Principal = Depends(get_current_principal)):
     """
     現在ログイン中のユーザー情報を取得します。
     """
-    return current_user
+    return principal.user
 
 
 # @router.get("/", response_model=List[schemas.User], summary="ユーザー一覧取得", dependencies=[Depends(security)])
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+既存データベースへのスキーマ変更の適用
+
+Base.metadata.create_all は存在しないテーブルのみを作成し、既存のテーブルに後から
+追加したインデックス（models の __table_args__）は作成しない。
+ensure_indexes はモデルに定義されたインデックスのうち、データベースに存在しないものだけを作成する。
+何度実行しても結果は同じ（冪等）。アプリ起動時と init_db.py から呼ばれる。
+
+casbin_rule（casbin_sqlalchemy_adapter が作成するテーブル）にはインデックスがないため、
+ドメイン単位の読み込み・ルールの削除が全件走査にならないよう CASBIN_RULE_INDEXES を追加する。
+    python schema_migrations.py
+"""
+from typing import List
+
+from casbin_sqlalchemy_adapter.adapter import CasbinRule
+from sqlalchemy import Index, inspect
+
+import models
+from database import engine as default_engine
+
+# casbin_rule のインデックス（テーブルに紐づくため、アダプターがテーブルを作成する際にも作成される）
+CASBIN_RULE_INDEXES = [
+    # p = sub, dom, obj, act: ドメイン単位の読み込み（ptype = 'p' AND v1 = :domain）
+    Index("ix_casbin_rule_ptype_v1", CasbinRule.ptype, CasbinRule.v1),
+    # g = user, role, dom: ドメイン単位の読み込み・ルールの削除（ptype = 'g' AND v2 = :domain AND v0 = :user）
+    Index("ix_casbin_rule_ptype_v2_v0", CasbinRule.ptype, CasbinRule.v2, CasbinRule.v0),
+    # ユーザー単位のロール同期（ptype = 'g' AND v0 IN (...)）
+    Index("ix_casbin_rule_ptype_v0", CasbinRule.ptype, CasbinRule.v0),
+]
+
+
+def ensure_indexes(engine=None) -> List[str]:
+    """
+    不足しているインデックスを作成
+
+    Returns:
+        List[str]: 作成したインデックス名
+    """
+    engine = engine or default_engine
+    inspector = inspect(engine)
+    created = []
+    for table in [*models.Base.metadata.sorted_tables, CasbinRule.__table__]:
+        created.extend(_create_missing_indexes(engine, inspector, table))
+    return created
+
+
+def ensure_casbin_rule_indexes(engine=None) -> List[str]:
+    """casbin_rule の不足しているインデックスを作成"""
+    engine = engine or default_engine
+    return _create_missing_indexes(engine, inspect(engine), CasbinRule.__table__)
+
+
+def _create_missing_indexes(engine, inspector, table) -> List[str]:
+    if not inspector.has_table(table.name):
+        # テーブルごと作成される場合はインデックスも create_all で作成される
+        return []
+    existing = {index["name"] for index in inspector.get_indexes(table.name)}
+    created = []
+    for index in sorted(table.indexes, key=lambda index: index.name):
+        if index.name not in existing:
+            index.create(engine)
+            created.append(index.name)
+    return created
+
+
+if __name__ == "__main__":
+    created = ensure_indexes()
+    for name in created:
+        print(f"Created index: {name}")
+    print(f"\nSchema migration completed: {len(created)} index(es) created")
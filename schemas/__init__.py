@@ -3,7 +3,7 @@ from .corporations import Corporation, CorporationBase, CorporationCreate, Corpo
 from .shops import Shop, ShopBase, ShopCreate, ShopUpdate
 from .inquiries import Inquiry, InquiryBase, InquiryCreate, InquiryUpdate, InquiryAssign, InquiryStatusUpdate
 from .roles import Role, RoleBase, RoleCreate, RoleUpdate, RolePermission, RolePermissionCreate, RolePermissionUpdate, RoleWithPermissions
-from .auth import LoginRequest, Token, TokenData
+from .auth import LoginRequest, Token, TokenData, PermissionMatrix
 
 __all__ = [
     # Users
@@ -19,5 +19,5 @@ __all__ = [
     "Role", "RoleBase", "RoleCreate", "RoleUpdate", "RolePermission", "RolePermissionCreate",
     "RolePermissionUpdate", "RoleWithPermissions",
     # Auth
-    "LoginRequest", "Token", "TokenData"
+    "LoginRequest", "Token", "TokenData", "PermissionMatrix"
 ]
\ No newline at end of file
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Dict, List, Optional
 
 
 class LoginRequest(BaseModel):
@@ -12,4 +13,13 @@ class Token(BaseModel):
 
 
 class TokenData(BaseModel):
-    username: str = None
\ No newline at end of file
+    username: str = None
+
+
+class PermissionMatrix(BaseModel):
+    """ログインユーザーの実効権限（resource → actions）"""
+    username: str
+    domain: Optional[str] = None
+    roles: List[str] = []
+    permissions: Dict[str, List[str]] = {}
+    policy_revision: Optional[int] = None
@@ -1,13 +1,14 @@
 import casbin
-from casbin_sqlalchemy_adapter import Adapter
-from database import SQLALCHEMY_DATABASE_URL, SessionLocal
+from casbin_config import ROLE_TEMPLATES, TEMPLATE_DOMAIN
+from policy_revision import create_adapter
+from database import SessionLocal
 import models
 
 def setup_casbin_policies():
     """Casbinのドメインベースポリシーを設定"""
 
-    # SQLAlchemy Adapterを使用
-    adapter = Adapter(SQLALCHEMY_DATABASE_URL)
+    # SQLAlchemy Adapterを使用（アプリ共通のEngine、書き込み時にポリシーリビジョンを更新）
+    adapter = create_adapter()
 
     # モデル設定ファイルを使用
     enforcer = casbin.Enforcer("model.conf", adapter)
@@ -45,57 +46,22 @@ def setup_casbin_policies():
             db.commit()
             print(f"Assigned admin role to Dave")
 
-        # ドメイン(Corporation)ベースのポリシーを追加
-        # ABC Corporation (domain: corporation_1)
-        abc_policies = [
-            # adminロールの権限
-            ["admin", "corporation_1", "users", "read"],
-            ["admin", "corporation_1", "users", "create"],
-            ["admin", "corporation_1", "users", "update"],
-            ["admin", "corporation_1", "users", "delete"],
-            ["admin", "corporation_1", "shops", "read"],
-            ["admin", "corporation_1", "shops", "create"],
-            ["admin", "corporation_1", "shops", "update"],
-            ["admin", "corporation_1", "shops", "delete"],
-            ["admin", "corporation_1", "inquiries", "read"],
-            ["admin", "corporation_1", "inquiries", "create"],
-            ["admin", "corporation_1", "inquiries", "update"],
-            ["admin", "corporation_1", "inquiries", "delete"],
-
-            # accountantロールの権限
-            ["accountant", "corporation_1", "users", "read"],
+        # ロールの権限はテンプレート（dom = "*"）として全ドメイン共通で登録する
+        for role, obj, act in ROLE_TEMPLATES:
+            policy = [role, TEMPLATE_DOMAIN, obj, act]
+            enforcer.add_policy(*policy)
+            print(f"Added role template: {policy}")
+
+        # テンプレートにない権限のみドメイン(Corporation)ごとに追加
+        domain_policies = [
+            # accountantロールの権限（ABC Corporation / DEF Corporation）
             ["accountant", "corporation_1", "shops", "read"],
             ["accountant", "corporation_1", "inquiries", "read"],
-        ]
-
-        # DEF Corporation (domain: corporation_2)
-        def_policies = [
-            # adminロールの権限
-            ["admin", "corporation_2", "users", "read"],
-            ["admin", "corporation_2", "users", "create"],
-            ["admin", "corporation_2", "users", "update"],
-            ["admin", "corporation_2", "users", "delete"],
-            ["admin", "corporation_2", "shops", "read"],
-            ["admin", "corporation_2", "shops", "create"],
-            ["admin", "corporation_2", "shops", "update"],
-            ["admin", "corporation_2", "shops", "delete"],
-            ["admin", "corporation_2", "inquiries", "read"],
-            ["admin", "corporation_2", "inquiries", "create"],
-            ["admin", "corporation_2", "inquiries", "update"],
-            ["admin", "corporation_2", "inquiries", "delete"],
-
-            # accountantロールの権限
-            ["accountant", "corporation_2", "users", "read"],
             ["accountant", "corporation_2", "shops", "read"],
             ["accountant", "corporation_2", "inquiries", "read"],
         ]
 
-        # ポリシーを追加
-        for policy in abc_policies:
-            enforcer.add_policy(*policy)
-            print(f"Added policy: {policy}")
-
-        for policy in def_policies:
+        for policy in domain_policies:
             enforcer.add_policy(*policy)
             print(f"Added policy: {policy}")
 
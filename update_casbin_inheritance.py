@@ -1,12 +1,11 @@
 import casbin
-from casbin_sqlalchemy_adapter import Adapter
-from database import SQLALCHEMY_DATABASE_URL
+from policy_revision import create_adapter
 
 def add_role_inheritance():
     """ロールの継承関係を追加（adminはaccountantの権限も継承）"""
 
-    # SQLAlchemy Adapterを使用
-    adapter = Adapter(SQLALCHEMY_DATABASE_URL)
+    # SQLAlchemy Adapterを使用（アプリ共通のEngine、書き込み時にポリシーリビジョンを更新）
+    adapter = create_adapter()
 
     # モデル設定ファイルを使用
     enforcer = casbin.Enforcer("model.conf", adapter)
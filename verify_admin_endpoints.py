@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+管理用エンドポイントの認可の確認
+
+URLからリソースを判定できない管理用エンドポイントは、所属法人での admin ロールで認可する
+（authorization_manager.admin_authorization_manager）。サンプルデータの
+- Alice（ABC Corporation の admin）: 200
+- Bob（ABC Corporation の accountant）: 403
+- トークンなし: 401 / 403
+になることを TestClient で確認する。期待と異なる場合は終了コード1で終わる。
+事前に init_db.py と bootstrap_casbin_policies.py を実行しておくこと。
+    python verify_admin_endpoints.py
+"""
+import sys
+
+from fastapi.testclient import TestClient
+
+import main
+
+ADMIN = "Alice"
+NON_ADMIN = "Bob"
+
+# (メソッド, パス)
+CASES = [
+    ("GET", "/metrics/requests"),
+    ("DELETE", "/metrics/requests"),
+    ("GET", "/roles/casbin-cache"),
+    ("POST", "/roles/reload-casbin?background=true"),
+    ("GET", "/roles/casbin-watcher"),
+]
+
+
+def _status(client: TestClient, method: str, path: str, token: str = None) -> int:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return client.request(method, path, headers=headers).status_code
+
+
+def verify() -> bool:
+    ok = True
+    print("=== Admin Endpoint Authorization ===")
+    print(f"{'endpoint':<48} {ADMIN:>6} {NON_ADMIN:>6} {'none':>6}")
+    with TestClient(main.app) as client:
+        for method, path in CASES:
+            statuses = [
+                _status(client, method, path, ADMIN),
+                _status(client, method, path, NON_ADMIN),
+                _status(client, method, path),
+            ]
+            passed = statuses[0] == 200 and statuses[1] == 403 and statuses[2] in (401, 403)
+            status = "PASS" if passed else "FAIL"
+            print(f"[{status}] {method + ' ' + path:<41} " + " ".join(f"{s:>6}" for s in statuses))
+            ok = ok and passed
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify() else 1)
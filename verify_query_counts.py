@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+エンドポイントごとの発行クエリ数の確認（N+1 の検出）
+
+TestClient でエンドポイントを呼び出し、1リクエストで発行されたSQLを数える。
+認証（トークン → ユーザー）・認可・依存関係（法人チェックなど）のクエリも含めるため、
+リクエストごとに認証済みユーザーのキャッシュ（principal_cache）を空にしてから呼び出す。
+件数の異なる2つのデータセットで実行し、
+- クエリ数が上限以内であること
+- クエリ数が行数に比例して増えないこと（関連の遅延ロードが行ごとに発生していないこと）
+を確認する。上限を超えた場合・件数で変わった場合・200以外が返った場合は終了コード1で終わる。
+アプリのデータベースは使わず、一時ディレクトリのSQLiteデータベースで確認する
+（DATABASE_URL をアプリのモジュールを読み込む前に差し替える）。
+    python verify_query_counts.py
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="verify_query_counts_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'verify.db')}"
+os.environ["DB_MODE"] = "sync"
+os.environ["CASBIN_WATCH_POLICIES"] = "0"
+
+from typing import List
+
+from casbin_sqlalchemy_adapter.adapter import CasbinRule
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+import main
+import models
+from casbin_config import bootstrap_policies
+from database import engine
+from enforcer_registry import registry
+from policy_revision import create_adapter
+from principal import principal_cache
+
+CORPORATION_ID = 1
+# リクエストするユーザー（ABC Corporation の admin）
+USERNAME = "user-1"
+# データセットの行数（ユーザーごとに別のロールを割り当て、遅延ロードがあれば行数分のクエリになる）
+SIZES = (5, 50)
+
+# (エンドポイント, クエリ数の上限)
+CASES = [
+    ("GET /users/me", 1),
+    ("GET /users/1", 2),
+    ("GET /corporations/", 2),
+    ("GET /corporations/1/users", 4),
+    ("GET /roles/users/1/roles", 4),
+    ("GET /shops/", 2),
+    ("GET /shops/1", 2),
+    ("GET /shops/corporation/1/shops", 3),
+    ("GET /inquiries/", 2),
+    ("GET /inquiries/1", 2),
+]
+
+
+def _seed(size: int) -> None:
+    """データセットを作成し、Casbinポリシー（ロールテンプレートとロール割り当て）を投入"""
+    create_adapter()
+    with engine.begin() as connection:
+        connection.execute(CasbinRule.__table__.delete())
+        for table in reversed(models.Base.metadata.sorted_tables):
+            if table is not models.PolicyRevision.__table__:
+                connection.execute(table.delete())
+
+        connection.execute(insert(models.Corporation), [
+            {"id": CORPORATION_ID, "name": "Verify Corporation", "code": "VERIFY", "is_active": True}
+        ])
+        connection.execute(insert(models.Role), [
+            {"id": i, "name": "admin" if i == 1 else f"role-{i}", "is_active": True} for i in range(1, size + 1)
+        ])
+        connection.execute(insert(models.User), [
+            {"id": i, "username": f"user-{i}", "email": f"user-{i}@example.com", "hashed_password": "-",
+             "is_active": True, "corporation_id": CORPORATION_ID, "role_id": i}
+            for i in range(1, size + 1)
+        ])
+        connection.execute(insert(models.Shop), [
+            {"id": i, "name": f"shop-{i}", "corporation_id": CORPORATION_ID, "is_active": True}
+            for i in range(1, size + 1)
+        ])
+        connection.execute(insert(models.Inquiry), [
+            {"id": i, "title": f"inquiry-{i}", "content": "verify", "user_id": i, "assigned_to_id": i,
+             "shop_id": i, "corporation_id": CORPORATION_ID}
+            for i in range(1, size + 1)
+        ])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bootstrap_policies()
+    registry.reload()
+
+
+def _count_statements() -> List[str]:
+    """実行されたSQLを記録するリスナーを登録"""
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+def _run(client: TestClient, statements: List[str], size: int) -> List[tuple]:
+    """各エンドポイントを呼び出し、(ステータスコード, 発行されたSQL) を返す"""
+    _seed(size)
+    results = []
+    for endpoint, _ in CASES:
+        method, path = endpoint.split(" ", 1)
+        principal_cache.clear()
+        statements.clear()
+        response = client.request(method, path, headers={"Authorization": f"Bearer {USERNAME}"})
+        results.append((response.status_code, list(statements)))
+    return results
+
+
+def verify() -> bool:
+    statements = _count_statements()
+    with TestClient(main.app) as client:
+        runs = {size: _run(client, statements, size) for size in SIZES}
+
+    ok = True
+    print("=== Query Count Verification (per request) ===")
+    print(f"{'endpoint':<37} " + " ".join(f"{f'rows={size}':>8}" for size in SIZES) + f" {'max':>4}")
+    for i, (endpoint, max_queries) in enumerate(CASES):
+        counts = [len(runs[size][i][1]) for size in SIZES]
+        problems = []
+        for size in SIZES:
+            status_code = runs[size][i][0]
+            if status_code != 200:
+                problems.append(f"status {status_code} (rows={size})")
+        if max(counts) > max_queries:
+            problems.append(f"more than {max_queries} queries")
+        if len(set(counts)) > 1:
+            problems.append("query count grows with rows (lazy load per row)")
+
+        status = "FAIL" if problems else "PASS"
+        print(f"[{status}] {endpoint:<30} " + " ".join(f"{count:>8}" for count in counts) + f" {max_queries:>4}")
+        for problem in problems:
+            print(f"        -> {problem}")
+        if problems:
+            for statement in runs[SIZES[-1]][i][1][:max_queries + 2]:
+                print(f"        {' '.join(statement.split())[:120]}")
+        ok = ok and not problems
+    return ok
+
+
+if __name__ == "__main__":
+    try:
+        passed = verify()
+    finally:
+        engine.dispose()
+        shutil.rmtree(_workdir, ignore_errors=True)
+    sys.exit(0 if passed else 1)
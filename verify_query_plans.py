@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+テナント単位の一覧クエリ・ドメイン単位のポリシー読み込みの実行計画の確認（SQLite）
+
+crud の一覧関数を実際に呼び出して発行されたSELECT文を取得し、EXPLAIN QUERY PLAN で
+- 期待する複合インデックスが使われていること（テーブル全件スキャンではないこと）
+- 並び順がインデックスで満たされ、一時B-treeでのソートが発生しないこと（該当する場合）
+を確認する。インデックスの削除やクエリの変更で実行計画が劣化した場合は終了コード1で終わる。
+アプリのデータベースは使わず、メモリ上のデータベースで確認する。
+    python verify_query_plans.py
+"""
+import sys
+
+import casbin
+from casbin_sqlalchemy_adapter.adapter import CasbinRule
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import crud
+import models
+from casbin_config import CASBIN_MODEL
+from filtered_enforcer import DOMAIN_FIELDS
+from policy_revision import RevisionedAdapter
+from schema_migrations import ensure_casbin_rule_indexes
+
+
+def _load_domain_policy(db):
+    adapter = RevisionedAdapter(db.get_bind(), filtered=True, create_all_models=False)
+    adapter.load_domain_policy(casbin.Enforcer.new_model(text=CASBIN_MODEL), "corporation_1", DOMAIN_FIELDS)
+
+
+# (説明, crudの呼び出し, 対象テーブル, 使われるべきインデックス, ソートがインデックスで満たされるべきか)
+CASES = [
+    ("get_shops (single tenant)",
+     lambda db: crud.get_shops(db, authorized=models.Shop.corporation_id == 1),
+     "shops", {"ix_shops_corporation_id_id"}, True),
+    ("get_shops (single tenant, cursor)",
+     lambda db: crud.get_shops(db, authorized=models.Shop.corporation_id == 1, after=10),
+     "shops", {"ix_shops_corporation_id_id"}, True),
+    ("get_shops (multi tenant)",
+     lambda db: crud.get_shops(db, authorized=models.Shop.corporation_id.in_([1, 2])),
+     "shops", {"ix_shops_corporation_id_id"}, False),
+    ("get_shops_by_corporation",
+     lambda db: crud.get_shops_by_corporation(db, corporation_id=1),
+     "shops", {"ix_shops_corporation_id_id"}, True),
+    ("get_inquiries (tenant)",
+     lambda db: crud.get_inquiries(db, authorized=models.Inquiry.corporation_id == 1),
+     "inquiries", {"ix_inquiries_corporation_id_id"}, True),
+    ("get_inquiries (tenant, cursor)",
+     lambda db: crud.get_inquiries(db, authorized=models.Inquiry.corporation_id == 1, after=10),
+     "inquiries", {"ix_inquiries_corporation_id_id"}, True),
+    ("get_inquiries (tenant, status)",
+     lambda db: crud.get_inquiries(db, status="pending", authorized=models.Inquiry.corporation_id == 1),
+     # 統計情報によっては、LIMITで打ち切れるID順の走査を選ぶ場合がある
+     "inquiries", {"ix_inquiries_corporation_status_priority_id", "ix_inquiries_corporation_id_id"}, False),
+    ("get_inquiries (tenant, status, priority)",
+     lambda db: crud.get_inquiries(db, status="pending", priority="high", authorized=models.Inquiry.corporation_id == 1),
+     "inquiries", {"ix_inquiries_corporation_status_priority_id"}, True),
+    ("get_users_by_corporation",
+     lambda db: crud.get_users_by_corporation(db, corporation_id=1),
+     "users", {"ix_users_corporation_id_id"}, True),
+    ("get_users_by_corporation (cursor)",
+     lambda db: crud.get_users_by_corporation(db, corporation_id=1, after=10),
+     "users", {"ix_users_corporation_id_id"}, True),
+    # p / g の2つのインデックスの結果をID順に並べ替える（一時B-treeは1ドメイン分の行のみ）
+    ("load_domain_policy (casbin_rule)",
+     _load_domain_policy,
+     "casbin_rule", {"ix_casbin_rule_ptype_v1", "ix_casbin_rule_ptype_v2_v0"}, False),
+]
+
+
+def _create_database():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(engine)
+    CasbinRule.__table__.create(engine)
+    ensure_casbin_rule_indexes(engine)
+    return engine
+
+
+def _capture_selects(engine):
+    """実行されたSELECT文とパラメーターを記録するリスナーを登録"""
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    return statements
+
+
+def _query_plan(engine, statement, parameters):
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def verify() -> bool:
+    engine = _create_database()
+    statements = _capture_selects(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    ok = True
+    print("=== Query Plan Verification ===")
+    for label, call, table, expected_indexes, ordered in CASES:
+        statements.clear()
+        db = SessionLocal()
+        try:
+            call(db)
+        finally:
+            db.close()
+        statement, parameters = next(
+            (s, p) for s, p in statements if f"FROM {table}" in s
+        )
+        plan = _query_plan(engine, statement, parameters)
+
+        problems = []
+        if not any(index in detail for detail in plan for index in expected_indexes):
+            problems.append(f"expected index {sorted(expected_indexes)}")
+        if any(detail.startswith(f"SCAN {table}") and "INDEX" not in detail for detail in plan):
+            problems.append("full table scan")
+        if ordered and any("TEMP B-TREE" in detail for detail in plan):
+            problems.append("sort not served by index")
+
+        status = "FAIL" if problems else "PASS"
+        print(f"[{status}] {label}")
+        for detail in plan:
+            print(f"        {detail}")
+        for problem in problems:
+            print(f"        -> {problem}")
+        ok = ok and not problems
+
+    engine.dispose()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify() else 1)